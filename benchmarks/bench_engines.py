@@ -0,0 +1,89 @@
+"""Correlation engines: NumPy vs compiled (Numba) kernels vs fused expressions.
+
+Checks every kernel and expression against NumPy first, then times each
+correlation on a (wells x pressures) grid and a full batch_arrays run.
+Engines whose package is missing are skipped.
+
+Run from the repository root:  python benchmarks/bench_engines.py [--wells 2000] [--pressures 451]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt import expressions, jit
+from pvt.batch import batch_arrays
+
+
+def best_of(func, repeat=3):
+    times=[]
+    for _ in range(repeat):
+        start=time.perf_counter()
+        func()
+        times.append(time.perf_counter()-start)
+    return min(times)
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=2000)
+    parser.add_argument("--pressures", type=int, default=451)
+    args=parser.parse_args()
+
+    engines={"numpy": lambda func: func}
+    if jit.AVAILABLE:
+        start=time.perf_counter()
+        report=jit.verify()
+        print(f"numba: verified {len(report)} kernels in {time.perf_counter()-start:.1f} s "
+              f"(includes compilation), worst relative difference {max(report.values()):.1e}")
+        engines["numba"]=jit.compiled
+    else:
+        print("numba: not installed, skipped")
+    report=expressions.verify()
+    print(f"fused ({'numexpr' if expressions.USE_NUMEXPR else 'blocked NumPy'}, {expressions.THREADS} threads): "
+          f"verified {len(report)} expressions, worst relative difference {max(report.values()):.1e}")
+    engines["fused"]=expressions.fused
+
+    rng=np.random.default_rng(0)
+    n, m = args.wells, args.pressures
+    inputs={name: values[:, None] for name, values in jit._sample_inputs(n, rng).items()}
+    inputs["p"]=np.linspace(15, 6000, m)[None, :]
+    ## Bo and uob are evaluated on the Rs curve, which is a full (wells x pressures) array
+    inputs["rs"]=inputs["rs"]*np.linspace(0.05, 1, m)[None, :]
+    print(f"{n} wells x {m} pressures = {n*m:,} values")
+    print(f"{'correlation':26s}"+"".join(f"{name:>10s}" for name in engines))
+    for numpy_func in expressions.EXPRESSIONS:
+        names=numpy_func.__code__.co_varnames[:numpy_func.__code__.co_argcount]
+        call_args={name: inputs[name] for name in names if name in inputs}
+        times=[]
+        for twin_of in engines.values():
+            twin=twin_of(numpy_func)
+            twin(**call_args)
+            times.append(best_of(lambda: twin(**call_args)))
+        print(f"{numpy_func.__name__:26s}"+"".join(f"{t*1e3:8.1f}ms" for t in times))
+
+    wells=pd.DataFrame({"API": rng.uniform(20, 50, n), "Yg": rng.uniform(0.6, 1.2, n), "T": rng.uniform(120, 300, n),
+                        "Psep": 150.0, "Tsep": 60.0, "Rsb": rng.uniform(200, 1500, n)})
+    p=np.linspace(500, 5000, m)
+    times, peaks = [], []
+    for engine in engines:
+        batch_arrays(wells, p, engine=engine)
+        times.append(best_of(lambda: batch_arrays(wells, p, engine=engine)))
+        tracemalloc.start()
+        batch_arrays(wells, p, engine=engine)
+        peaks.append(tracemalloc.get_traced_memory()[1]/2**20)
+        tracemalloc.stop()
+    print(f"{'batch_arrays (all props)':26s}"+"".join(f"{t*1e3:8.1f}ms" for t in times))
+    print(f"{'  peak memory':26s}"+"".join(f"{mb:8.0f}MB" for mb in peaks))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
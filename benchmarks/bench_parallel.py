@@ -0,0 +1,68 @@
+"""Scaling of the process-pool batch backend from 1 to N workers.
+
+Run from the repository root:
+    python benchmarks/bench_parallel.py [--wells 20000] [--points 1000] [--max-workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt.batch import batch_arrays
+from pvt.parallel import parallel_batch_arrays
+
+## the Bo chain of the FVF page and the viscosity chain of the Viscosity page
+PROPS=("bo", "uo")
+
+
+def synthetic_wells(n, seed=0):
+    rng=np.random.default_rng(seed)
+    return pd.DataFrame({
+        "API": rng.uniform(20, 50, n),
+        "Yg": rng.uniform(0.6, 1.0, n),
+        "T": rng.uniform(150, 280, n),
+        "Pb": rng.uniform(1500, 3500, n),
+        "Psep": 150.0,
+        "Tsep": 60.0,
+        "Rsb": rng.uniform(300, 900, n),
+    })
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=20000)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args=parser.parse_args()
+
+    wells=synthetic_wells(args.wells)
+    p=np.linspace(500, 6000, args.points)
+    print(f"{args.wells} wells x {args.points} pressures, props={','.join(PROPS)}, "
+          f"{os.cpu_count()} CPUs")
+
+    start=time.perf_counter()
+    serial=batch_arrays(wells, p, PROPS)
+    base=time.perf_counter()-start
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':>8}{base:>10.2f}{1:>9.2f}x")
+
+    counts=sorted({args.max_workers, *(2**i for i in range(args.max_workers.bit_length()) if 2**i<=args.max_workers)})
+    for workers in counts:
+        start=time.perf_counter()
+        result=parallel_batch_arrays(wells, p, PROPS, workers=workers, chunk_size=args.chunk_size)
+        elapsed=time.perf_counter()-start
+        for prop in PROPS:
+            np.testing.assert_array_equal(result[prop], serial[prop])
+        print(f"{workers:>8}{elapsed:>10.2f}{base/elapsed:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
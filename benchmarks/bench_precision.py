@@ -0,0 +1,53 @@
+"""float32 vs float64 batches: time, peak memory, Parquet size and error.
+
+Run from the repository root:  python benchmarks/bench_precision.py [--wells 5000] [--pressures 451]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt.batch import DTYPES, ENGINES, batch_arrays, precision_report, to_long
+from pvt.io import to_bytes
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=5000)
+    parser.add_argument("--pressures", type=int, default=451)
+    parser.add_argument("--engine", choices=list(ENGINES), default="numpy")
+    args=parser.parse_args()
+
+    rng=np.random.default_rng(0)
+    n=args.wells
+    wells=pd.DataFrame({"API": rng.uniform(15, 55, n), "Yg": rng.uniform(0.6, 1.2, n), "T": rng.uniform(120, 300, n),
+                        "Psep": 150.0, "Tsep": 60.0, "Rsb": rng.uniform(100, 1500, n)})
+    p=np.linspace(500, 5000, args.pressures)
+    print(f"{n} wells x {len(p)} pressures, all properties, engine {args.engine}")
+    for dtype in DTYPES:
+        batch_arrays(wells.head(10), p, engine=args.engine, dtype=dtype)
+        tracemalloc.start()
+        start=time.perf_counter()
+        arrays=batch_arrays(wells, p, engine=args.engine, dtype=dtype)
+        seconds=time.perf_counter()-start
+        peak=tracemalloc.get_traced_memory()[1]/2**20
+        tracemalloc.stop()
+        parquet=len(to_bytes(to_long(wells, p, arrays), "parquet"))/2**20
+        print(f"  {dtype}: {seconds*1e3:6.0f} ms, peak {peak:5.0f} MB, Parquet {parquet:5.1f} MB")
+
+    report=precision_report(wells.head(500), p, "float32", args.engine)
+    print("float32 relative error against float64 (first 500 wells):")
+    with pd.option_context("display.width", 120, "display.float_format", "{:.1e}".format):
+        print(report.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Per-psi loop vs whole-array Rs evaluation over the widest page range.
+
+Run from the repository root:  python benchmarks/bench_solubility.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pvt
+
+## the Gas Solubility page maximum: p=np.arange(500,Pr,1) with Pr=12000
+PR=12000
+API, YG, T, PSEP, TSEP, PB = 47.1, 0.851, 250, 150, 60, 2377+14.7
+P=np.arange(500, PR, 1)
+
+ARGS={
+    pvt.Rs_standing: (API, YG, T),
+    pvt.Rs_beggs: (API, YG, T, PSEP, TSEP),
+    pvt.Rs_Marhouns: (API, YG, T),
+    pvt.Rs_Petrosky_farshad: (API, YG, T),
+}
+
+
+def looped(func, args):
+    ## what the page used to do: one branch and one list append per psi
+    lst=[]
+    for pressure in P:
+        if pressure<PB:
+            lst.append(func(pressure, *args))
+        else:
+            lst.append(func(PB, *args))
+    return lst
+
+
+def main(repeat=5):
+    print(f"{len(P)} pressure points (500..{PR} psia, 1 psi step)")
+    print(f"{'correlation':<22}{'loop (ms)':>12}{'array (ms)':>12}{'speedup':>10}")
+    for func, args in ARGS.items():
+        np.testing.assert_allclose(looped(func, args), func(P, *args, pb=PB), rtol=1e-12)
+        t_loop=min(timeit.repeat(lambda: looped(func, args), number=1, repeat=repeat))
+        t_vec=min(timeit.repeat(lambda: func(P, *args, pb=PB), number=10, repeat=repeat))/10
+        print(f"{func.__name__:<22}{t_loop*1e3:>12.2f}{t_vec*1e3:>12.3f}{t_loop/t_vec:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
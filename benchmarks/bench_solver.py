@@ -0,0 +1,64 @@
+"""Numerical Rs inversion vs the closed-form Pb correlations.
+
+For each correlation, solves Rs(pb) == rs for a batch of random fluids with
+pvt.solver.invert_rs and compares time, convergence and round-trip error
+(how far Rs(pb) lands from the input rs) with the closed-form Pb formula.
+
+Run from the repository root:  python benchmarks/bench_solver.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pvt
+from pvt.solver import invert_rs
+
+PAIRS={
+    "Standing": (pvt.Rs_standing, pvt.Pb_standing, False),
+    "Vasquez-Beggs": (pvt.Rs_beggs, pvt.Pb_beggs, True),
+    "Marhoun": (pvt.Rs_Marhouns, pvt.Pb_marhouns, False),
+    "Petrosky-Farshad": (pvt.Rs_Petrosky_farshad, pvt.Pb_petrosky, False),
+}
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args=parser.parse_args()
+
+    rng=np.random.default_rng(args.seed)
+    n=args.rows
+    api, yg, T, rs = rng.uniform(20, 50, n), rng.uniform(0.6, 1.0, n), rng.uniform(150, 280, n), rng.uniform(100, 1200, n)
+    psep, tsep = rng.uniform(50, 300, n), rng.uniform(40, 120, n)
+
+    print(f"{n} rows")
+    print(f"{'correlation':<18}{'solver (s)':>11}{'closed (s)':>11}{'converged':>11}{'max iter':>9}"
+          f"{'solver rt err':>15}{'closed rt err':>15}")
+    for name, (rs_func, pb_func, separator) in PAIRS.items():
+        extra=(psep, tsep) if separator else ()
+        start=time.perf_counter()
+        result=invert_rs(rs_func, rs, api, yg, T, *extra)
+        t_solver=time.perf_counter()-start
+        start=time.perf_counter()
+        closed=pb_func(rs, api, yg, T, *extra)
+        t_closed=time.perf_counter()-start
+
+        ok=result.converged
+        with np.errstate(invalid="ignore"):
+            err_solver=np.max(np.abs(rs_func(result.pb[ok], api[ok], yg[ok], T[ok], *(e[ok] for e in extra))/rs[ok]-1))
+            err_closed=np.nanmax(np.abs(rs_func(closed, api, yg, T, *extra)/rs-1))
+        print(f"{name:<18}{t_solver:>11.3f}{t_closed:>11.3f}{ok.mean():>10.2%}{result.iterations.max():>9}"
+              f"{err_solver:>15.1e}{err_closed:>15.1e}")
+    print("rows that do not converge have an Rs below the correlation's value at 14.7 psia")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
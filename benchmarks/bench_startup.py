@@ -0,0 +1,135 @@
+"""Cold start of every page: import time and first-render time, against a budget.
+
+Each page is measured in fresh interpreters, as a newly started server
+process would see it: the time to import streamlit, then the page's own
+imports, then its first rerun with default inputs.  Each figure is the best
+of ``--repeat`` processes.
+
+Absolute times depend on the machine, so the budget in
+``benchmarks/startup_budget.json`` is relative: the page imports and first
+render are measured as multiples of the bare ``import streamlit`` in the
+same process, and any ratio above its entry fails the run (exit status 1).
+``--update`` rewrites the budget from this run times ``--headroom``, and
+``--scale`` loosens (or tightens) every entry for a noisy machine.
+
+Run from the repository root:  python benchmarks/bench_startup.py [--repeat 3] [--update]
+"""
+
+import argparse
+import ast
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET=os.path.join(ROOT, "benchmarks", "startup_budget.json")
+METRICS=("streamlit", "imports", "first_render")
+## the metric the others are budgeted against
+BASELINE="streamlit"
+## smallest budget written by --update, as a fraction of the baseline; tiny ratios are mostly noise
+FLOOR=0.1
+
+
+def pages():
+    return ["About.py"]+sorted("pages/"+name for name in os.listdir(os.path.join(ROOT, "pages")) if name.endswith(".py"))
+
+
+def measure(page):
+    ## runs in the child process: nothing heavy may be imported before the clock starts
+    path=os.path.join(ROOT, page)
+    with open(path, encoding="utf-8") as f:
+        tree=ast.parse(f.read(), path)
+    imports=ast.Module([node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], [])
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    start=time.perf_counter()
+    import streamlit  # noqa: F401
+    streamlit_s=time.perf_counter()-start
+
+    start=time.perf_counter()
+    exec(compile(imports, path, "exec"), {"__name__": "__main__", "__file__": path})
+    imports_s=time.perf_counter()-start
+
+    from suite import bare_runtime, run_page
+
+    bare_runtime()
+    start=time.perf_counter()
+    run_page(page)
+    first_s=time.perf_counter()-start
+    return {"streamlit": streamlit_s*1e3, "imports": imports_s*1e3, "first_render": first_s*1e3}
+
+
+def run_child(page):
+    out=subprocess.run([sys.executable, os.path.abspath(__file__), "--child", page], capture_output=True, text=True,
+                       cwd=ROOT)
+    if out.returncode:
+        raise RuntimeError(f"{page} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per page (default: 3)")
+    parser.add_argument("--budget", default=BUDGET, help="budget file (default: benchmarks/startup_budget.json)")
+    parser.add_argument("--update", action="store_true", help="write this run's ratios times --headroom as the new budget")
+    parser.add_argument("--headroom", type=float, default=2.0,
+                        help=f"budget = measured ratio x headroom, at least {FLOOR} (default: 2)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget entry by this when checking (default: 1)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args=parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return 0
+
+    budget={}
+    if os.path.exists(args.budget) and not args.update:
+        with open(args.budget) as f:
+            budget=json.load(f)["pages"]
+    results={}
+    over=[]
+    print(f"{'page':36s}"+"".join(f"{name:>14s}" for name in METRICS)+f"{'total':>10s}   "
+          f"(ms, best of {args.repeat}; x = multiple of {BASELINE})")
+    for page in pages():
+        runs=[run_child(page) for _ in range(args.repeat)]
+        best={name: min(run[name] for run in runs) for name in METRICS}
+        ## each run's ratios use that process's own baseline
+        ratios={name: min(run[name]/run[BASELINE] for run in runs) for name in METRICS if name!=BASELINE}
+        results[page]=ratios
+        limits=budget.get(page, {})
+        cells=[f"{best[BASELINE]:13.0f} "]
+        for name, ratio in ratios.items():
+            flag=""
+            if name in limits and ratio>limits[name]*args.scale:
+                flag="!"
+                over.append((page, name, ratio, limits[name]*args.scale))
+            cells.append(f"{best[name]:7.0f} {ratio:4.2f}x{flag or ' '}")
+        print(f"{page:36s}"+"".join(cells)+f"{sum(best.values()):10.0f}", flush=True)
+
+    if args.update:
+        pages_budget={page: {name: max(FLOOR, math.ceil(ratio*args.headroom*100)/100) for name, ratio in ratios.items()}
+                      for page, ratios in results.items()}
+        with open(args.budget, "w") as f:
+            json.dump({"baseline": "import streamlit", "headroom": args.headroom, "pages": pages_budget}, f, indent=1)
+            f.write("\n")
+        print(f"budget written to {args.budget}")
+        return 0
+    if not budget:
+        print(f"no budget in {args.budget}; create one with --update")
+        return 0
+    if over:
+        print(f"{len(over)} figure(s) over budget:")
+        for page, name, value, limit in over:
+            print(f"  {page} {name}: {value:.2f}x > {limit:.2f}x {BASELINE}")
+        return 1
+    print("every page within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""PVTTable lookups vs direct correlation evaluation.
+
+Run from the repository root:  python benchmarks/bench_table.py [--queries 1000000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt.batch import batch_arrays
+from pvt.table import PVTTable
+
+FLUID=dict(API=47.1, Yg=0.851, T=250, Psep=150, Tsep=60, Rsb=751, Pb=2377)
+PROPS=("rs", "bo", "co", "uo")
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1_000_000)
+    parser.add_argument("--points", type=int, default=4001)
+    args=parser.parse_args()
+
+    build=min(timeit.repeat(lambda: PVTTable.build(FLUID, points=args.points, props=PROPS), number=1, repeat=3))
+    table=PVTTable.build(FLUID, points=args.points, props=PROPS)
+    p=np.random.default_rng(0).uniform(table.pressure[0], table.pressure[-1], args.queries)
+    wells=pd.DataFrame([FLUID])
+
+    t_table=min(timeit.repeat(lambda: table.query(p), number=1, repeat=5))
+    t_direct=min(timeit.repeat(lambda: batch_arrays(wells, p, PROPS), number=1, repeat=5))
+    print(f"table of {len(table.pressure)} points built in {build*1e3:.1f} ms")
+    print(f"{args.queries} random queries of {','.join(PROPS)}: table {t_table*1e3:.1f} ms, "
+          f"direct {t_direct*1e3:.1f} ms ({t_direct/t_table:.1f}x)")
+    for name, err in table.interpolation_error().items():
+        print(f"  max relative interpolation error {name}: {err:.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Monte Carlo throughput in samples per second.
+
+Run from the repository root:  python benchmarks/bench_uncertainty.py [--samples 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt.uncertainty import monte_carlo
+
+INPUTS={"API": ("normal", 47.1, 1.5), "Yg": ("normal", 0.851, 0.03), "T": ("uniform", 230, 270),
+        "Psep": 150, "Tsep": 60, "Rsb": ("triangular", 680, 751, 820)}
+CASES=[
+    ("Bo Standing", ("bo",), {}),
+    ("Bo Marhoun", ("bo",), {"bo": "Marhoun"}),
+    ("uo Beggs-Robinson", ("uo",), {"uob": "Beggs-Robinson"}),
+]
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--points", type=int, default=46, help="pressure points (default: 46)")
+    parser.add_argument("--block-size", type=int, default=None)
+    args=parser.parse_args()
+
+    p=np.linspace(500, 5000, args.points)
+    print(f"{args.samples} samples x {args.points} pressures")
+    for label, props, correlations in CASES:
+        tracemalloc.start()
+        start=time.perf_counter()
+        result=monte_carlo(INPUTS, p, props, n_samples=args.samples, seed=0,
+                           block_size=args.block_size, **correlations)
+        elapsed=time.perf_counter()-start
+        peak=tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        bands=result.bands[props[0]]
+        print(f"  {label:<18} {args.samples/elapsed:>12,.0f} samples/s  {elapsed:6.2f} s  "
+              f"peak {peak/2**20:5.0f} MB  P10/P50/P90 at {p[0]:g} psia: "
+              f"{bands[10][0]:.4f} / {bands[50][0]:.4f} / {bands[90][0]:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Regression check: the chunked batch command matches an unchunked run.
+
+Writes a well table with no ``Well`` column as CSV, Parquet and Arrow, runs
+``python -m pvt batch`` on each with a chunk size that splits it unevenly
+and with one chunk, and compares the outputs, well ids included (the row
+number serves as the id).  Any difference is listed and the script exits
+with status 1.
+
+Run from the repository root:  python benchmarks/check_chunking.py [--wells 25] [--chunksize 10]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvt.cli import main as pvt_main
+from pvt.io import read_table, to_bytes
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=25)
+    parser.add_argument("--chunksize", type=int, default=10)
+    args=parser.parse_args()
+
+    rng=np.random.default_rng(0)
+    n=args.wells
+    wells=pd.DataFrame({"API": rng.uniform(20, 50, n), "Yg": rng.uniform(0.6, 1.2, n), "T": rng.uniform(120, 300, n),
+                        "Psep": 150.0, "Tsep": 60.0, "Rsb": rng.uniform(200, 1500, n)})
+    failed=[]
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("csv", "parquet", "arrow"):
+            source=os.path.join(tmp, "wells."+ext)
+            with open(source, "wb") as f:
+                f.write(to_bytes(wells, ext))
+            outputs=[]
+            for chunksize in (args.chunksize, n):
+                out=os.path.join(tmp, f"out_{chunksize}.parquet")
+                pvt_main(["batch", source, out, "--chunksize", str(chunksize), "--step", "500"])
+                outputs.append(read_table(out, "parquet"))
+            chunked, whole = outputs
+            if not chunked.equals(whole):
+                ids=chunked["Well"].drop_duplicates().tolist()
+                failed.append(f"{ext}: chunked output differs from one chunk (well ids {ids})")
+            print(f"{ext:8s} {n} wells in chunks of {args.chunksize}: {'ok' if chunked.equals(whole) else 'DIFFERENT'}")
+    for message in failed:
+        print(message, file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Load test of the HTTP/JSON API: p50/p99 latency and throughput per request type.
+
+Starts ``python -m pvt serve`` on a free local port (or uses ``--url``) and
+sends each scenario from ``--concurrency`` client threads, each with its own
+keep-alive connection, until ``--requests`` requests have been answered:
+
+  scalar  Rs_standing at one pressure
+  curve   Rs_standing at 1000 pressures
+  fluids  Bo_Standing for 1000 fluids at once
+  batch   /batch for 100 wells x 100 pressures, every property
+
+Run from the repository root:  python benchmarks/load_test.py [--concurrency 8] [--requests 2000]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+## the pages' default fluid
+FLUID={"api": 47.1, "yg": 0.851, "T": 250.0, "pb": 2377.0}
+
+
+def scenarios():
+    rng=np.random.default_rng(0)
+    p=np.linspace(15, 5000, 1000).round(1).tolist()
+    wells=[{"Well": f"W{i}", "API": float(rng.uniform(15, 55)), "Yg": float(rng.uniform(0.6, 1.2)),
+            "T": float(rng.uniform(120, 300)), "Psep": 150.0, "Tsep": 60.0, "Rsb": float(rng.uniform(100, 1500))}
+           for i in range(100)]
+    return {
+        "scalar": ("/correlations/Rs_standing", {"inputs": dict(FLUID, p=3000.0)}),
+        "curve": ("/correlations/Rs_standing", {"inputs": dict(FLUID, p=p)}),
+        "fluids": ("/correlations/Bo_Standing", {"inputs": {"rs": rng.uniform(100, 1500, 1000).round(1).tolist(),
+                                                            "api": rng.uniform(15, 55, 1000).round(2).tolist(),
+                                                            "yg": 0.851, "T": 250.0}}),
+        "batch": ("/batch", {"wells": wells, "pressures": np.linspace(500, 5000, 100).tolist()}),
+    }
+
+
+def start_server():
+    ## (process, url) of a quiet local instance on a free port
+    proc=subprocess.Popen([sys.executable, "-m", "pvt", "serve", "--port", "0", "--quiet"], cwd=ROOT,
+                          stdout=subprocess.PIPE, text=True)
+    line=proc.stdout.readline()
+    if not line.startswith("serving"):
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    return proc, line.split()[-1]
+
+
+def run(url, path, body, requests, concurrency):
+    ## (latencies in seconds, errors, wall time)
+    parts=urlsplit(url)
+    data=json.dumps(body).encode()
+    headers={"Content-Type": "application/json"}
+    latencies=[]
+    errors=[0]
+    remaining=[requests]
+    lock=threading.Lock()
+
+    def client():
+        conn=http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        times=[]
+        failed=0
+        while True:
+            with lock:
+                if remaining[0]<=0:
+                    break
+                remaining[0]-=1
+            start=time.perf_counter()
+            try:
+                conn.request("POST", path, data, headers)
+                response=conn.getresponse()
+                response.read()
+                ok=response.status==200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                ok=False
+            times.append(time.perf_counter()-start)
+            failed+=not ok
+        conn.close()
+        with lock:
+            latencies.extend(times)
+            errors[0]+=failed
+
+    threads=[threading.Thread(target=client) for _ in range(concurrency)]
+    start=time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(latencies), errors[0], time.perf_counter()-start
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="running instance, e.g. http://127.0.0.1:8000 "
+                                                    "(default: start one on a free port)")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads (default: 8)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario (default: 2000)")
+    parser.add_argument("--scenario", action="append", choices=list(scenarios()), default=None,
+                        help="run only this scenario (repeatable; default: all)")
+    args=parser.parse_args()
+
+    proc=None
+    url=args.url
+    if url is None:
+        proc, url=start_server()
+    try:
+        print(f"{url}, {args.concurrency} clients, {args.requests} requests per scenario")
+        print(f"  {'scenario':8s} {'req/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'errors':>7s}")
+        failed=0
+        for name, (path, body) in scenarios().items():
+            if args.scenario and name not in args.scenario:
+                continue
+            run(url, path, body, min(50, args.requests), args.concurrency)
+            latencies, errors, seconds=run(url, path, body, args.requests, args.concurrency)
+            p50, p99=np.percentile(latencies, [50, 99])*1e3
+            print(f"  {name:8s} {len(latencies)/seconds:9.0f} {p50:9.2f} {p99:9.2f} {latencies.max()*1e3:9.2f} "
+                  f"{errors:7d}", flush=True)
+            failed+=errors
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Benchmark suite: every page correlation at 1e2-1e7 points plus page reruns.
+
+Each correlation is timed on a grid of N points (pressure, Rs or
+temperature, as on its page) with the remaining inputs fixed at the pages'
+defaults.  Every page is run headless with its default inputs, once with
+empty caches ("cold") and once more with the caches warm ("rerun").
+
+Results are appended as one JSON line to a history file and compared with
+the median of the last few runs on the same machine; timings that got
+slower than the threshold are listed, and ``--check`` turns them into a non-zero exit.
+A run that fails ``--check`` is recorded with ``"failed": true`` and left out
+of later baselines, so repeated failing runs cannot drag the median up until
+the check passes.
+
+Run from the repository root:  python benchmarks/suite.py [--quick] [--check]
+"""
+
+import argparse
+import datetime
+import glob
+import inspect
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pvt
+
+HISTORY=os.path.join(ROOT, "benchmarks", "history.jsonl")
+SIZES=(10**2, 10**3, 10**4, 10**5, 10**6, 10**7)
+
+## the pages' default fluid
+FLUID={"api": 47.1, "yg": 0.851, "T": 250.0, "psep": 150.0, "tsep": 60.0, "pb": 2391.7,
+       "rsb": 751.0, "bob": 1.4, "uod": 1.2, "uob": 0.5, "rho_o": 45.0}
+
+## (correlation, argument swept over the grid, its range)
+CORRELATIONS=[(func, "p", (15.0, 6000.0)) for func in (
+    pvt.Rs_standing, pvt.Rs_beggs, pvt.Rs_Marhouns, pvt.Rs_Petrosky_farshad, pvt.Rs_compare)]
+CORRELATIONS+=[(func, "rs", (50.0, 1500.0)) for func in (
+    pvt.Pb_standing, pvt.Pb_beggs, pvt.Pb_marhouns, pvt.Pb_petrosky, pvt.Pb_compare,
+    pvt.Bo_Standing, pvt.Bo_Vasquez_Beggs, pvt.Bo_Glaso, pvt.Bo_Marhoun, pvt.Bo_Petrosky_Farshad, pvt.Bo_MBE,
+    pvt.uob_Chew_Connally, pvt.uob_Beggs_Robinson)]
+CORRELATIONS+=[(func, "p", (2391.7, 6000.0)) for func in (
+    pvt.Co_Vasquez_Beggs, pvt.Co_Petrosky_Farshad, pvt.above_pb_Vasquez_Beggs, pvt.above_pb_Petrosky_Farshad,
+    pvt.uo_Vasquez_Beggs)]
+CORRELATIONS+=[(func, "T", (100.0, 300.0)) for func in (pvt.uod_Beal, pvt.uod_Beggs_Robinson, pvt.uod_Glaso)]
+
+PAGES=["About.py"]+sorted(glob.glob("pages/*.py", root_dir=ROOT))
+
+
+def best_of(call, budget=0.05, repeat=5):
+    ## seconds per call: enough calls per repeat to fill the budget, best of the repeats
+    start=time.perf_counter()
+    call()
+    single=time.perf_counter()-start
+    number=max(1, int(budget/max(single, 1e-9)))
+    times=[]
+    for _ in range(repeat):
+        start=time.perf_counter()
+        for _ in range(number):
+            call()
+        times.append((time.perf_counter()-start)/number)
+    return min(times)
+
+
+def time_correlations(sizes, only=None):
+    results={}
+    for func, grid, (lo, hi) in CORRELATIONS:
+        if only and only not in func.__name__:
+            continue
+        params=inspect.signature(func).parameters
+        fixed={name: FLUID[name] for name in params if name in FLUID and name!=grid}
+        for n in sizes:
+            args=dict(fixed, **{grid: np.linspace(lo, hi, n)})
+            seconds=best_of(lambda: func(**args))
+            results[f"{func.__name__}@{n:.0e}"]=seconds
+            print(f"  {func.__name__:28s} {n:>9.0e} {seconds*1e3:10.3f} ms {n/seconds/1e6:8.1f} M points/s", flush=True)
+    return results
+
+
+def run_page(path):
+    ## one headless rerun of a page (path relative to the repository root) with default inputs
+    from streamlit.runtime.scriptrunner import StopException
+
+    try:
+        runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+    except StopException:
+        ## st.stop() ends a rerun normally, e.g. a page waiting for a button
+        pass
+
+
+def bare_runtime():
+    ## let pages run without a server: quiet logging and the stand-in runtime streamlit's own script tests use
+    from unittest.mock import MagicMock
+
+    from streamlit import config, logger
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    ## bare runs warn about the missing session on every element
+    config.set_option("logger.level", "error")
+    logger.set_log_level("error")
+    ## st.image and the caches need a runtime
+    runtime=MagicMock(spec=Runtime)
+    runtime.media_file_mgr=MediaFileManager(MemoryMediaFileStorage("/media"))
+    runtime.cache_storage_manager=MemoryCacheStorageManager()
+    Runtime._instance=runtime
+
+
+def time_pages(only=None):
+    import streamlit as st
+    from pvt.cache import curves
+
+    bare_runtime()
+
+    def clear():
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        curves.clear()
+
+    results={}
+    cwd=os.getcwd()
+    os.chdir(ROOT)
+    try:
+        for page in PAGES:
+            if only and only not in page:
+                continue
+            run_page(page)
+            cold=[]
+            for _ in range(3):
+                clear()
+                start=time.perf_counter()
+                run_page(page)
+                cold.append(time.perf_counter()-start)
+            rerun=best_of(lambda: run_page(page), budget=0.2)
+            results[f"page:{page}:cold"]=min(cold)
+            results[f"page:{page}:rerun"]=rerun
+            print(f"  {page:36s} cold {min(cold)*1e3:9.1f} ms   rerun {rerun*1e3:9.1f} ms", flush=True)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def _commit():
+    try:
+        sha=subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                           check=True).stdout.strip()
+        dirty=subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        return sha+("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {"host": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version(), "numpy": np.__version__}
+
+
+def baseline(history, env, runs=5):
+    ## (median of each timing, commits) over the last runs recorded with the same host, Python and NumPy
+    if not os.path.exists(history):
+        return {}, []
+    records=[]
+    with open(history) as f:
+        for line in f:
+            if line.strip():
+                record=json.loads(line)
+                ## runs that failed --check are kept for the record but never become the baseline
+                if record.get("environment")==env and not record.get("failed"):
+                    records.append(record)
+    records=records[-runs:]
+    names={name for record in records for name in record["results"]}
+    medians={name: float(np.median([r["results"][name] for r in records if name in r["results"]])) for name in names}
+    return medians, [record["commit"] for record in records]
+
+
+def regressions(old, new, threshold, floor=1e-4):
+    ## (name, old, new) for every timing more than threshold slower; sub-floor timings are mostly call overhead
+    out=[]
+    for name, seconds in new.items():
+        before=old.get(name)
+        if before is not None and before>=floor and seconds>before*(1+threshold):
+            out.append((name, before, seconds))
+    return out
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(f"{n:.0e}" for n in SIZES),
+                        help="comma-separated grid sizes (default: 1e2 to 1e7)")
+    parser.add_argument("--quick", action="store_true", help="grid sizes up to 1e5 only")
+    parser.add_argument("--only", default=None, help="run only correlations/pages whose name contains this")
+    parser.add_argument("--skip-pages", action="store_true", help="time the correlations only")
+    parser.add_argument("--history", default=HISTORY, help="JSON-lines history file (default: benchmarks/history.jsonl)")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="relative slowdown reported as a regression (default: 0.5)")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any timing regressed")
+    args=parser.parse_args()
+
+    sizes=[int(float(v)) for v in args.sizes.split(",") if v.strip()]
+    if args.quick:
+        sizes=[n for n in sizes if n<=10**5]
+    env=environment()
+    print(f"correlations at {', '.join(f'{n:.0e}' for n in sizes)} points")
+    results=time_correlations(sizes, args.only)
+    if not args.skip_pages:
+        print("pages (default inputs)")
+        results.update(time_pages(args.only))
+
+    record={"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": _commit(),
+            "environment": env, "results": results}
+    medians, commits = baseline(args.history, env)
+    slower=regressions(medians, results, args.threshold)
+    against=f"the median of {len(commits)} earlier run(s) ({', '.join(dict.fromkeys(map(str, commits)))})"
+    if not commits:
+        print(f"no earlier run on this machine in {args.history}")
+    elif slower:
+        print(f"{len(slower)} regression(s) against {against}:")
+        for name, before, after in slower:
+            print(f"  {name:44s} {before*1e3:10.3f} ms -> {after*1e3:10.3f} ms ({after/before-1:+.0%})")
+    else:
+        print(f"no regressions beyond {args.threshold:.0%} against {against}")
+    failed=bool(args.check and slower)
+    if failed:
+        record["failed"]=True
+    if not args.no_save:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record)+"\n")
+        print(f"appended to {args.history}"+(" as failed, outside later baselines" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
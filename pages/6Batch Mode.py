@@ -0,0 +1,132 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+import pvt
+from pvt.cache import cached_curve
+from pvt.io import MIME_TYPES, read_table, to_bytes
+from pvt.batch import (
+    DTYPES,
+    ENGINES,
+    PROPERTIES,
+    COLUMNS,
+    WELL_COLUMNS,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+    precision_report,
+)
+from pvt.profiling import session_profiler, sidebar_panel
+
+## opt-in stage timings, switched on in the sidebar
+profiler=session_profiler('Batch Mode')
+
+## wells used for the float32 error report
+REPORT_WELLS=200
+
+
+@profiler.timed('ingestion')
+@st.cache_data
+def load_data(url,ext,dtype=None):
+    data=read_table(url,ext=ext,dtype=dtype)
+    return data
+
+@profiler.timed('table')
+@st.cache_data
+def convert_df(df,ext='csv'):
+    return to_bytes(df,ext)
+
+
+st.set_page_config(page_title="Batch Mode", layout="centered")
+
+st.title("Batch Mode")
+st.markdown('---')
+st.write('''Compute Rs, Pb, Bo, Co and oil viscosity curves for a whole field in one pass.
+Upload a table with one row per well and the columns below; an optional :green[Well] column names the wells.
+Wells without a bubble point get one from the selected Pb correlation applied to Rsb.
+''')
+st.dataframe(pd.DataFrame({'Column':list(WELL_COLUMNS),
+                           'Unit':['°API','-','°F','psia','psig','°F','scf/STB']}),hide_index=True)
+st.markdown('---')
+
+st.subheader('File Upload')
+ext=st.radio("Choose the file type",["csv","excel","parquet","arrow"])
+precision=st.radio('Precision',list(DTYPES),horizontal=True,
+                   help='float32 reads, computes and exports in single precision: half the memory for large screening runs, '
+                        'about 7 significant digits.')
+uploaded_file=st.file_uploader("Choose a file")
+
+if uploaded_file is not None:
+    wells=load_data(uploaded_file,ext,precision)
+else:
+    wells=pd.DataFrame({'Well':['Default'],'API':[47.1],'Yg':[0.851],'T':[250],'Pb':[2377],
+                        'Psep':[150],'Tsep':[60],'Rsb':[751]})
+    st.markdown(" :red[NOTE: Default test data has been used for understanding purposes, upload a well table to run a field]")
+
+if st.checkbox("Show Raw Data",False):
+    st.subheader("Raw Data")
+    st.write(wells)
+
+st.subheader('Pressure Range')
+col1,col2,col3=st.columns(3)
+with col1:
+    p_min=st.number_input('Minimum pressure(psia)',min_value=15,value=500)
+with col2:
+    p_max=st.number_input('Maximum pressure(psia)',min_value=16,value=5000)
+with col3:
+    step=st.number_input('Step(psi)',min_value=1,value=10)
+p=np.arange(p_min,p_max+step,step)
+
+st.subheader('Selection of Correlations')
+props=st.multiselect('Properties',list(PROPERTIES),default=list(PROPERTIES),format_func=COLUMNS.get)
+col1,col2=st.columns(2)
+with col1:
+    rs=st.selectbox('Rs',list(RS_CORRELATIONS))
+    pb=st.selectbox('Pb',list(PB_CORRELATIONS))
+    bo=st.selectbox('Bo below bubble point',list(BO_CORRELATIONS))
+with col2:
+    co=st.selectbox('Co and Bo above bubble point',list(CO_CORRELATIONS))
+    uod=st.selectbox('Dead oil viscosity',list(UOD_CORRELATIONS))
+    uob=st.selectbox('Saturated oil viscosity',list(UOB_CORRELATIONS))
+engine=st.radio('Evaluation engine',list(ENGINES),horizontal=True,
+                help='numba: compiled, multi-core kernels for the Rs, Bo and viscosity correlations (the first run compiles them). '
+                     'fused: the same correlations as numexpr-style expressions, evaluated in cache-sized blocks on all cores. '
+                     'Both fall back to NumPy when their package is not installed.')
+
+if props:
+    try:
+        with profiler.stage('compute'):
+            result=cached_curve(pvt.run_batch,wells,p,tuple(props),rs=rs,pb=pb,bo=bo,co=co,uod=uod,uob=uob,engine=engine,dtype=precision)
+    except ValueError as err:
+        st.error(str(err))
+        sidebar_panel(profiler)
+        st.stop()
+
+    st.subheader('Results')
+    st.write(f"{len(wells)} wells x {len(p)} pressures = {len(result)} rows ({precision})")
+    if precision!='float64':
+        with st.expander(f'{precision} error against float64'):
+            sample=wells.head(REPORT_WELLS)
+            with profiler.stage('compute'):
+                report=cached_curve(precision_report,sample,p,precision,engine)
+            st.dataframe(report,hide_index=True)
+            st.caption(f"Relative error of every correlation over the first {len(sample)} well(s)")
+    with profiler.stage('table'):
+        st.dataframe(result)
+    st.download_button(
+        label='Download results as CSV',
+        data=convert_df(result),
+        file_name='batch_results.csv',
+        mime='text/csv'
+    )
+    st.download_button(
+        label='Download results as Parquet',
+        data=convert_df(result,'parquet'),
+        file_name='batch_results.parquet',
+        mime=MIME_TYPES['parquet']
+    )
+
+sidebar_panel(profiler)
@@ -0,0 +1,135 @@
+import streamlit as st
+import numpy as np
+
+from pvt.cache import cached_curve
+from pvt.io import MIME_TYPES, to_bytes
+from pvt.plotting import lines_figure
+from pvt.uncertainty import DISTRIBUTIONS, monte_carlo, to_frame
+from pvt.batch import (
+    PROPERTIES,
+    COLUMNS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+)
+from pvt.profiling import session_profiler, sidebar_panel
+
+## opt-in stage timings, switched on in the sidebar
+profiler=session_profiler('Uncertainty')
+
+
+@profiler.timed('table')
+@st.cache_data
+def convert_df(df,ext='csv'):
+    return to_bytes(df,ext)
+
+
+st.set_page_config(page_title="Uncertainty", layout="centered")
+
+st.title("Uncertainty (Monte Carlo)")
+st.markdown('---')
+st.write('''Lab measurements of API gravity, gas gravity, temperature and Rsb carry uncertainty.
+Give each input a distribution and the selected correlations are evaluated for every sample in one array pass,
+reported as :green[P10 / P50 / P90] bands (10th, 50th and 90th percentiles) at every pressure.
+Each sample's bubble point comes from the selected Pb correlation applied to its Rsb.
+''')
+st.markdown('---')
+
+## input -> (label, default value, default spread)
+INPUTS={'API':('Oil API gravity(°API)',47.1,1.5),
+        'Yg':('Gas specific gravity',0.851,0.03),
+        'T':('Temperature(°F)',250.0,10.0),
+        'Rsb':('Solution GOR at Pb(scf/STB)',751.0,40.0),
+        'Psep':('Separator pressure(psig)',150.0,10.0),
+        'Tsep':('Separator temperature(°F)',60.0,5.0)}
+
+st.subheader('Input Distributions')
+inputs={}
+for column,(label,value,spread) in INPUTS.items():
+    col1,col2,col3,col4=st.columns([2,2,1.5,1.5])
+    with col1:
+        dist=st.selectbox(label,list(DISTRIBUTIONS),index=2 if column in ('API','Yg','T','Rsb') else 0,key=column)
+    names=DISTRIBUTIONS[dist][1]
+    if dist=='fixed':
+        with col2:
+            inputs[column]=st.number_input('value',value=value,key=column+'_value')
+        continue
+    if names==('mean','sd'):
+        defaults=(value,spread)
+    elif names==('low','high'):
+        defaults=(value-2*spread,value+2*spread)
+    else:
+        defaults=(value-2*spread,value,value+2*spread)
+    params=[]
+    for col,name,default in zip([col2,col3,col4],names,defaults):
+        with col:
+            params.append(st.number_input(name,value=default,key=column+'_'+name))
+    inputs[column]=(dist,*params)
+
+st.subheader('Sampling')
+col1,col2=st.columns(2)
+with col1:
+    n_samples=st.number_input('Number of samples',min_value=100,max_value=5_000_000,value=100_000,step=10_000)
+with col2:
+    seed=st.number_input('Random seed',min_value=0,value=42)
+
+st.subheader('Pressure Range')
+col1,col2,col3=st.columns(3)
+with col1:
+    p_min=st.number_input('Minimum pressure(psia)',min_value=15,value=500)
+with col2:
+    p_max=st.number_input('Maximum pressure(psia)',min_value=16,value=5000)
+with col3:
+    step=st.number_input('Step(psi)',min_value=1,value=100)
+p=np.arange(p_min,p_max+step,step)
+
+st.subheader('Selection of Correlations')
+props=st.multiselect('Properties',[x for x in PROPERTIES if x!='pb'],default=['bo','uo'],format_func=COLUMNS.get)
+col1,col2=st.columns(2)
+with col1:
+    rs=st.selectbox('Rs',list(RS_CORRELATIONS))
+    pb=st.selectbox('Pb',list(PB_CORRELATIONS))
+    bo=st.selectbox('Bo below bubble point',list(BO_CORRELATIONS))
+with col2:
+    co=st.selectbox('Co and Bo above bubble point',list(CO_CORRELATIONS))
+    uod=st.selectbox('Dead oil viscosity',list(UOD_CORRELATIONS))
+    uob=st.selectbox('Saturated oil viscosity',list(UOB_CORRELATIONS))
+
+if props:
+    try:
+        with profiler.stage('compute'):
+            result=cached_curve(monte_carlo,inputs,p,tuple(props),n_samples=int(n_samples),seed=int(seed),
+                                rs=rs,pb=pb,bo=bo,co=co,uod=uod,uob=uob)
+    except ValueError as err:
+        st.error(str(err))
+        sidebar_panel(profiler)
+        st.stop()
+
+    st.subheader('Percentile Bands')
+    with profiler.stage('table'):
+        df=to_frame(result)
+    with profiler.stage('plot'):
+        for name in props:
+            curves={f'P{q}':band for q,band in result.bands[name].items()}
+            st.write(lines_figure(p,curves,"Pressure(psia)",COLUMNS[name],title=COLUMNS[name]+' uncertainty'))
+    with profiler.stage('table'):
+        st.dataframe(df,hide_index=True)
+    st.caption(f"{result.samples:,} samples, seed {int(seed)}; percentiles resolved to "
+               +", ".join(f"{COLUMNS[name]} ±{np.nanmax(result.resolution[name]):.2g}" for name in props))
+    st.download_button(
+        label='Download bands as CSV',
+        data=convert_df(df),
+        file_name='uncertainty_bands.csv',
+        mime='text/csv'
+    )
+    st.download_button(
+        label='Download bands as Parquet',
+        data=convert_df(df,'parquet'),
+        file_name='uncertainty_bands.parquet',
+        mime=MIME_TYPES['parquet']
+    )
+
+sidebar_panel(profiler)
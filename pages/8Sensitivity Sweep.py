@@ -0,0 +1,138 @@
+import streamlit as st
+import numpy as np
+import hashlib
+import json
+import os
+import tempfile
+
+from pvt.plotting import lines_figure
+from pvt.sweep import META, SweepCube, prune, remove, sweep
+from pvt.batch import (
+    DTYPES,
+    PROPERTIES,
+    COLUMNS,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+)
+from pvt.profiling import session_profiler, sidebar_panel
+
+## opt-in stage timings, switched on in the sidebar
+profiler=session_profiler('Sensitivity Sweep')
+
+SWEEP_ROOT=os.path.join(tempfile.gettempdir(),'pvt_sweeps')
+
+st.set_page_config(page_title="Sensitivity Sweep", layout="centered")
+
+st.title("Sensitivity Sweep")
+st.markdown('---')
+st.write('''Evaluate every combination of temperature, API gravity and gas gravity at every pressure, for several Bo correlations at once.
+Results are written block by block to a :green[memory-mapped array on disk], so sweeps larger than memory are fine
+and an interrupted sweep picks up from the last completed block when run again.
+''')
+st.markdown('---')
+
+def axis_input(label,start,stop,step,fmt='%g'):
+    col1,col2,col3=st.columns(3)
+    with col1:
+        lo=st.number_input(label+' from',value=start,format=fmt)
+    with col2:
+        hi=st.number_input(label+' to',value=stop,format=fmt)
+    with col3:
+        dx=st.number_input(label+' step',value=step,min_value=step/100,format=fmt)
+    return [float(round(v,6)) for v in np.arange(lo,hi+dx/2,dx)]
+
+st.subheader('Swept Inputs')
+axes={'T':axis_input('Temperature(°F)',150.0,300.0,10.0),
+      'API':axis_input('Oil API gravity(°API)',25.0,50.0,1.0),
+      'Yg':axis_input('Gas specific gravity',0.6,1.1,0.05,'%.3f')}
+
+st.subheader('Fixed Inputs')
+col1,col2,col3=st.columns(3)
+with col1:
+    Rsb=st.number_input('Solution GOR at Pb(scf/STB)',value=751.0)
+with col2:
+    Psep=st.number_input('Separator pressure(psig)',value=150.0)
+with col3:
+    Tsep=st.number_input('Separator temperature(°F)',value=60.0)
+fixed={'Rsb':Rsb,'Psep':Psep,'Tsep':Tsep}
+
+st.subheader('Pressure Range')
+col1,col2,col3=st.columns(3)
+with col1:
+    p_min=st.number_input('Minimum pressure(psia)',min_value=15,value=500)
+with col2:
+    p_max=st.number_input('Maximum pressure(psia)',min_value=16,value=5000)
+with col3:
+    step=st.number_input('Step(psi)',min_value=1,value=10)
+p=np.arange(p_min,p_max+step,step)
+
+st.subheader('Selection of Correlations')
+props=st.multiselect('Properties',[x for x in PROPERTIES if x!='pb'],default=['rs','bo'],format_func=COLUMNS.get)
+bo_list=st.multiselect('Bo correlations to compare',list(BO_CORRELATIONS),default=['Standing','Marhoun'])
+col1,col2=st.columns(2)
+with col1:
+    rs=st.selectbox('Rs',list(RS_CORRELATIONS))
+    pb=st.selectbox('Pb',list(PB_CORRELATIONS))
+    co=st.selectbox('Co and Bo above bubble point',list(CO_CORRELATIONS))
+with col2:
+    uod=st.selectbox('Dead oil viscosity',list(UOD_CORRELATIONS))
+    uob=st.selectbox('Saturated oil viscosity',list(UOB_CORRELATIONS))
+variants={name:{'rs':rs,'pb':pb,'bo':name,'co':co,'uod':uod,'uob':uob} for name in bo_list}
+precision=st.radio('Precision',list(DTYPES),horizontal=True,help='float32 halves the file on disk')
+
+if not props or not variants:
+    sidebar_panel(profiler)
+    st.stop()
+
+## one directory per sweep definition, so rerunning the same sweep resumes it
+spec=json.dumps([axes,fixed,list(map(float,p)),props,variants,precision],sort_keys=True)
+path=os.path.join(SWEEP_ROOT,hashlib.blake2b(spec.encode(),digest_size=8).hexdigest())
+cells=len(variants)*len(props)*int(np.prod([len(v) for v in axes.values()]))*len(p)
+st.write(f"{' x '.join(str(len(v)) for v in axes.values())} input combinations x {len(p)} pressures x "
+         f"{len(variants)} variants x {len(props)} properties = {cells:,} values ({cells*np.dtype(precision).itemsize/2**20:,.0f} MB on disk)")
+
+cube=SweepCube(path) if os.path.exists(os.path.join(path,META)) else None
+if cube is None or not cube.complete:
+    label='Resume sweep' if cube is not None else 'Run sweep'
+    if cube is not None:
+        st.info(f"Sweep interrupted after {cube.meta['completed']} of {cube.blocks} blocks")
+    if not st.button(label):
+        sidebar_panel(profiler)
+        st.stop()
+    ## make room first: sweeps unused for a week, then the least recently used beyond the size limit
+    prune(SWEEP_ROOT,keep=(path,))
+    bar=st.progress(0.0)
+    with profiler.stage('compute'):
+        cube=sweep(path,axes,p,props,fixed,variants,progress=lambda done,total:bar.progress(done/total),dtype=precision)
+
+## viewing counts as a use, so prune() keeps the sweeps that are being looked at
+os.utime(path)
+
+st.subheader('Slice')
+prop=st.selectbox('Property',props,format_func=COLUMNS.get)
+variant=st.selectbox('Bo correlation',list(variants))
+vary=st.radio('Overlay curves for',list(axes),horizontal=True)
+coords={}
+for column,values in axes.items():
+    if column!=vary:
+        coords[column]=st.select_slider(column,options=values,value=values[len(values)//2])
+
+## a (values of the overlaid axis x pressure) view of the file; only the plotted rows are read
+with profiler.stage('ingestion'):
+    view=cube.sel(prop,variant,**coords)
+curves={f"{vary}={v:g}":row for v,row in zip(axes[vary],view)}
+title=f"{COLUMNS[prop]} - {variant}, "+", ".join(f"{k}={v:g}" for k,v in coords.items())
+with profiler.stage('plot'):
+    st.write(lines_figure(p,curves,"Pressure(psia)",COLUMNS[prop],title=title))
+st.caption(f"Sweep stored in {path}; unused sweeps are deleted after a week or when they outgrow the disk limit")
+if st.button('Delete this sweep'):
+    if remove(path):
+        st.success('Sweep deleted')
+    else:
+        st.warning('Another session is still computing this sweep')
+
+sidebar_panel(profiler)
@@ -0,0 +1,116 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import json
+
+from pvt.cache import cached_curve
+from pvt.io import read_table
+from pvt.lazy import lazy_import
+from pvt.tuning import LAB_COLUMNS, LIBRARY, MODELS, fit, save_sets
+from pvt.profiling import session_profiler, sidebar_panel
+
+## plotly.express is only imported when the parity plot is drawn
+px=lazy_import('plotly.express')
+
+## opt-in stage timings, switched on in the sidebar
+profiler=session_profiler('Coefficient Tuning')
+
+
+@profiler.timed('ingestion')
+@st.cache_data
+def load_data(url,ext):
+    data=read_table(url,ext=ext)
+    return data
+
+@profiler.timed('ingestion')
+@st.cache_data
+def demo_data():
+    ## three synthetic basins around perturbed published coefficients, 0.2% measurement noise
+    rng=np.random.default_rng(7)
+    frames=[]
+    for basin,shift in [('Basin A',0.97),('Basin B',1.0),('Basin C',1.04)]:
+        n=60
+        rs,api,yg,T=rng.uniform(100,1200,n),rng.uniform(25,48,n),rng.uniform(0.65,1.1,n),rng.uniform(120,280,n)
+        coef=np.array(MODELS['Bo Standing'].default)*[1,shift,1,1,1]
+        bo=MODELS['Bo Standing'].func(rs,api,yg,T,coef=tuple(coef))*(1+rng.normal(0,0.002,n))
+        frames.append(pd.DataFrame({'Basin':basin,'Rs':rs,'API':api,'Yg':yg,'T':T,'Bo':bo}))
+    return pd.concat(frames,ignore_index=True)
+
+
+st.set_page_config(page_title="Coefficient Tuning", layout="centered")
+
+st.title("Coefficient Tuning")
+st.markdown('---')
+st.write('''Fit correlation coefficients to measured lab data, one set per basin.
+Every basin is tuned at once by a Levenberg-Marquardt regression with analytic derivatives, and the tuned sets can be
+saved to the coefficient library, where the Formation Volume Factor page offers them next to the published constants.
+''')
+st.dataframe(pd.DataFrame({'Column':['Basin (optional)']+list(LAB_COLUMNS),
+                           'Unit':['-','scf/STB','°API','-','°F','rb/STB (measured)']}),hide_index=True)
+st.markdown('---')
+
+st.subheader('Lab Data Upload')
+ext=st.radio("Choose the file type",["csv","excel","parquet","arrow"])
+uploaded_file=st.file_uploader("Choose a file")
+if uploaded_file is not None:
+    data=load_data(uploaded_file,ext)
+else:
+    data=demo_data()
+    st.markdown(" :red[NOTE: Synthetic demo data for three basins has been used, upload lab data to tune your own basins]")
+
+if st.checkbox("Show Raw Data",False):
+    st.subheader("Raw Data")
+    st.write(data)
+
+st.subheader('Selection of Correlation')
+model=st.selectbox('Correlation to tune',list(MODELS))
+basin=st.selectbox('Basin column',['Basin']+[c for c in data.columns if c not in LAB_COLUMNS and c!='Basin'])
+
+try:
+    with profiler.stage('compute'):
+        result=cached_curve(fit,data,model,basin=basin)
+except ValueError as err:
+    st.error(str(err))
+    sidebar_panel(profiler)
+    st.stop()
+
+st.subheader('Fit Quality')
+stats=result.stats
+st.write(f"{len(stats)} basin(s), {int(stats['Points'].sum())} points tuned in {result.seconds*1e3:.0f} ms; "
+         f"{int(stats['Converged'].sum())} converged")
+with profiler.stage('table'):
+    st.dataframe(stats)
+st.subheader('Tuned Coefficients')
+with profiler.stage('table'):
+    published=pd.DataFrame([MODELS[model].default],index=['Published'],columns=list(MODELS[model].names))
+    st.dataframe(pd.concat([published,result.coefficients]))
+
+## measured vs predicted for every point, published and tuned
+with profiler.stage('compute'):
+    parity=[]
+    for name,group in (data.groupby(basin) if basin in data.columns else [('all',data)]):
+        if str(name) not in result.coefficients.index:
+            continue
+        args=[group[c].to_numpy(dtype=float) for c in ('Rs','API','Yg','T')]
+        for label,coef in [('Published',MODELS[model].default),('Tuned',tuple(result.coefficients.loc[str(name)]))]:
+            parity.append(pd.DataFrame({'Measured Bo(rb/STB)':group['Bo'].to_numpy(dtype=float),
+                                        'Predicted Bo(rb/STB)':MODELS[model].func(*args,coef=coef),
+                                        'Coefficients':label,'Basin':str(name)}))
+    parity=pd.concat(parity,ignore_index=True)
+with profiler.stage('plot'):
+    fig=px.scatter(parity,x='Measured Bo(rb/STB)',y='Predicted Bo(rb/STB)',color='Coefficients',
+                   hover_data=['Basin'],render_mode='webgl',title=model+' parity plot')
+    lo,hi=parity['Measured Bo(rb/STB)'].min(),parity['Measured Bo(rb/STB)'].max()
+    fig.add_shape(type='line',x0=lo,y0=lo,x1=hi,y1=hi,line=dict(color='grey',dash='dash'))
+    st.write(fig)
+
+st.subheader('Save Coefficients')
+prefix=st.text_input('Set name prefix (e.g. field or study name)',value='')
+if st.button('Save to coefficient library'):
+    save_sets(result,prefix=prefix)
+    st.success(f"Saved {len(result.coefficients)} {model} set(s) to {LIBRARY}")
+tuned={model:{prefix+name:[float(v) for v in row] for name,row in result.coefficients.iterrows()}}
+st.download_button('Download tuned coefficients as JSON',json.dumps(tuned,indent=1),
+                   file_name='coefficients.json',mime='application/json')
+
+sidebar_panel(profiler)
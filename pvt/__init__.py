@@ -0,0 +1,81 @@
+"""Headless PVT correlations for black-oil reservoir fluids.
+
+Every function here is pure: it takes its inputs explicitly, works on
+scalars or NumPy arrays (broadcasting like any ufunc) and never touches
+Streamlit.  Units follow the pages: pressures in psia, separator pressure
+in psig, temperatures in °F, Rs in scf/STB, Bo in rb/STB and viscosity in cp.
+
+``import pvt`` loads NumPy only.  The batch, solver, table and uncertainty
+helpers are re-exported lazily: their modules (and pandas) are imported the
+first time one of them is used.
+"""
+
+from pvt.common import Yo, Ygs
+from pvt.solubility import Rs_standing, Rs_beggs, Rs_Marhouns, Rs_Petrosky_farshad, Rs_compare
+from pvt.bubble_point import Pb_standing, Pb_beggs, Pb_marhouns, Pb_petrosky, Pb_compare
+from pvt.fvf import (
+    Bo_Standing,
+    Bo_Vasquez_Beggs,
+    Bo_Glaso,
+    Bo_Marhoun,
+    Bo_Petrosky_Farshad,
+    Bo_MBE,
+    Co_Vasquez_Beggs,
+    Co_Petrosky_Farshad,
+    above_pb_Vasquez_Beggs,
+    above_pb_Petrosky_Farshad,
+)
+from pvt.viscosity import (
+    uod_Beal,
+    uod_Beggs_Robinson,
+    uod_Glaso,
+    uob_Chew_Connally,
+    uob_Beggs_Robinson,
+    uo_Vasquez_Beggs,
+)
+from pvt.lazy import lazy_exports
+
+## re-exports whose modules pull in pandas, imported on first use
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "batch_arrays": "pvt.batch",
+    "run_batch": "pvt.batch",
+    "invert_rs": "pvt.solver",
+    "PVTTable": "pvt.table",
+    "monte_carlo": "pvt.uncertainty",
+})
+
+__all__ = [
+    "Yo",
+    "Ygs",
+    "Rs_standing",
+    "Rs_beggs",
+    "Rs_Marhouns",
+    "Rs_Petrosky_farshad",
+    "Rs_compare",
+    "Pb_standing",
+    "Pb_beggs",
+    "Pb_marhouns",
+    "Pb_petrosky",
+    "Pb_compare",
+    "Bo_Standing",
+    "Bo_Vasquez_Beggs",
+    "Bo_Glaso",
+    "Bo_Marhoun",
+    "Bo_Petrosky_Farshad",
+    "Bo_MBE",
+    "Co_Vasquez_Beggs",
+    "Co_Petrosky_Farshad",
+    "above_pb_Vasquez_Beggs",
+    "above_pb_Petrosky_Farshad",
+    "uod_Beal",
+    "uod_Beggs_Robinson",
+    "uod_Glaso",
+    "uob_Chew_Connally",
+    "uob_Beggs_Robinson",
+    "uo_Vasquez_Beggs",
+    "batch_arrays",
+    "run_batch",
+    "invert_rs",
+    "PVTTable",
+    "monte_carlo",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from pvt.cli import main
+
+sys.exit(main())
@@ -0,0 +1,239 @@
+"""Multi-well batch evaluation.
+
+A batch is a table with one row per well (``API, Yg, T, Pb, Psep, Tsep, Rsb``)
+and one shared pressure array.  Every property is computed as a single
+(wells x pressures) array operation: well inputs become column vectors and
+broadcast against the pressure row, so there is no loop over wells.
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from pvt.solubility import Rs_standing, Rs_beggs, Rs_Marhouns, Rs_Petrosky_farshad
+from pvt.bubble_point import Pb_standing, Pb_beggs, Pb_marhouns, Pb_petrosky
+from pvt.fvf import (
+    Bo_Standing,
+    Bo_Vasquez_Beggs,
+    Bo_Glaso,
+    Bo_Marhoun,
+    Bo_Petrosky_Farshad,
+    Co_Vasquez_Beggs,
+    Co_Petrosky_Farshad,
+    above_pb_Vasquez_Beggs,
+    above_pb_Petrosky_Farshad,
+)
+from pvt.viscosity import (
+    uod_Beal,
+    uod_Beggs_Robinson,
+    uod_Glaso,
+    uob_Chew_Connally,
+    uob_Beggs_Robinson,
+    uo_Vasquez_Beggs,
+)
+
+## input table column -> correlation argument name
+WELL_COLUMNS={"API": "api", "Yg": "yg", "T": "T", "Pb": "pb", "Psep": "psep", "Tsep": "tsep", "Rsb": "rsb"}
+
+PROPERTIES=("rs", "pb", "bo", "co", "uo")
+
+## long-format output column for each property
+COLUMNS={
+    "rs": "Rs(scf/STB)",
+    "pb": "Pb(psia)",
+    "bo": "Bo(rb/STB)",
+    "co": "Co(1/psi)",
+    "uo": "uo(cp)",
+}
+
+RS_CORRELATIONS={
+    "Standing": Rs_standing,
+    "Vasquez-Beggs": Rs_beggs,
+    "Marhoun": Rs_Marhouns,
+    "Petrosky-Farshad": Rs_Petrosky_farshad,
+}
+PB_CORRELATIONS={
+    "Standing": Pb_standing,
+    "Vasquez-Beggs": Pb_beggs,
+    "Marhoun": Pb_marhouns,
+    "Petrosky-Farshad": Pb_petrosky,
+}
+BO_CORRELATIONS={
+    "Standing": Bo_Standing,
+    "Vasquez-Beggs": Bo_Vasquez_Beggs,
+    "Glaso": Bo_Glaso,
+    "Marhoun": Bo_Marhoun,
+    "Petrosky-Farshad": Bo_Petrosky_Farshad,
+}
+## undersaturated Bo and its compressibility come from the same Co correlation
+CO_CORRELATIONS={
+    "Vasquez-Beggs": (Co_Vasquez_Beggs, above_pb_Vasquez_Beggs),
+    "Petrosky-Farshad": (Co_Petrosky_Farshad, above_pb_Petrosky_Farshad),
+}
+UOD_CORRELATIONS={
+    "Beal": uod_Beal,
+    "Beggs-Robinson": uod_Beggs_Robinson,
+    "Glaso": uod_Glaso,
+}
+UOB_CORRELATIONS={
+    "Chew-Connally": uob_Chew_Connally,
+    "Beggs-Robinson": uob_Beggs_Robinson,
+}
+
+
+def _call(func, first, fluid, **extra):
+    ## pass each correlation only the fluid inputs its signature asks for
+    params=list(inspect.signature(func).parameters)[1:]
+    kwargs={name: fluid[name] for name in params if name in fluid}
+    kwargs.update((k, v) for k, v in extra.items() if k in params)
+    return func(first, **kwargs)
+
+
+def well_inputs(wells, dtype="float64"):
+    """Column vectors (n_wells x 1) of the correlation inputs in a well table."""
+    missing=[c for c in WELL_COLUMNS if c not in wells.columns and c!="Pb"]
+    if missing:
+        raise ValueError(f"well table is missing column(s): {', '.join(missing)}")
+    fluid={}
+    for column, name in WELL_COLUMNS.items():
+        if column in wells.columns:
+            fluid[name]=wells[column].to_numpy(dtype=dtype)[:, None]
+    return fluid
+
+
+## how the Rs, Bo and live-oil viscosity correlations are evaluated: plain NumPy,
+## compiled kernels (pvt.jit) or fused expressions (pvt.expressions)
+ENGINES=("numpy", "numba", "fused")
+
+
+def _backend(engine):
+    ## maps a NumPy correlation to the function batch_arrays should call
+    if engine=="numpy":
+        return lambda func: func
+    if engine=="numba":
+        from pvt.jit import compiled
+        return compiled
+    if engine=="fused":
+        from pvt.expressions import fused
+        return fused
+    raise ValueError(f"unknown engine '{engine}' (choose from {', '.join(ENGINES)})")
+
+
+## working and output precision; float32 halves memory and bandwidth for screening runs
+DTYPES=("float64", "float32")
+
+
+def check_dtype(dtype):
+    """``dtype`` as a NumPy dtype, if it is one of :data:`DTYPES`."""
+    if str(np.dtype(dtype)) not in DTYPES:
+        raise ValueError(f"unknown dtype '{dtype}' (choose from {', '.join(DTYPES)})")
+    return np.dtype(dtype)
+
+
+def batch_arrays(wells, p, props=PROPERTIES, rs="Standing", pb="Standing", bo="Standing",
+                 co="Vasquez-Beggs", uod="Beal", uob="Chew-Connally", engine="numpy", dtype="float64"):
+    """Compute the requested properties for every well at every pressure.
+
+    Returns a dict mapping each property in ``props`` to a (n_wells x n_p)
+    array.  A well's bubble point comes from its ``Pb`` column, or from the
+    ``pb`` correlation applied to ``Rsb`` where Pb is missing; the ``pb``
+    property is that effective bubble point.  ``engine``
+    picks how the Rs, Bo and live-oil viscosity correlations run: ``"numba"``
+    uses the compiled kernels of :mod:`pvt.jit` and ``"fused"`` the
+    expressions of :mod:`pvt.expressions`; both fall back to NumPy when
+    their optional dependency is missing.  ``dtype="float32"`` computes and
+    returns every array in single precision (see :func:`precision_report`).
+    """
+    unknown=set(props)-set(PROPERTIES)
+    if unknown:
+        raise ValueError(f"unknown properties: {', '.join(sorted(unknown))}")
+    compiled=_backend(engine)
+    dtype=check_dtype(dtype)
+    fluid=well_inputs(wells, dtype)
+    p=np.asarray(p, dtype=dtype)[None, :]
+    shape=(len(wells), p.shape[1])
+
+    pb_corr=_call(PB_CORRELATIONS[pb], fluid["rsb"], fluid)
+    if "pb" in fluid:
+        fluid["pb"]=np.where(np.isnan(fluid["pb"]), pb_corr, fluid["pb"])
+    else:
+        fluid["pb"]=pb_corr
+    saturated=p<=fluid["pb"]
+
+    out={}
+    if "pb" in props:
+        out["pb"]=np.broadcast_to(fluid["pb"], shape)
+    if {"rs", "bo", "uo"} & set(props):
+        ## the Rs correlations clamp at the well's pb themselves
+        rs_func=compiled(RS_CORRELATIONS[rs])
+        rs_curve=_call(rs_func, p, fluid)
+        rs_pb=_call(rs_func, fluid["pb"], fluid)
+        if "rs" in props:
+            out["rs"]=rs_curve
+    if "co" in props or "bo" in props:
+        co_func, above_func=CO_CORRELATIONS[co]
+        if "co" in props:
+            out["co"]=np.where(saturated, np.nan, _call(co_func, p, fluid))
+        if "bo" in props:
+            bo_func=compiled(BO_CORRELATIONS[bo])
+            bob=_call(bo_func, rs_pb, fluid)
+            above=_call(above_func, p, fluid, bob=bob)
+            out["bo"]=np.where(saturated, _call(bo_func, rs_curve, fluid), above)
+    if "uo" in props:
+        uod_value=_call(compiled(UOD_CORRELATIONS[uod]), fluid["api"], fluid)
+        uob_func=compiled(UOB_CORRELATIONS[uob])
+        uob_pb=uob_func(rs_pb, uod_value)
+        above=uo_Vasquez_Beggs(p, fluid["pb"], uob_pb)
+        out["uo"]=np.where(saturated, uob_func(rs_curve, uod_value), above)
+    return {name: out[name].astype(dtype, copy=False) for name in props}
+
+
+def to_long(wells, p, arrays):
+    """Flatten per-property (n_wells x n_p) arrays into one long-format table.
+
+    Pressure is stored in the arrays' dtype, so a float32 batch stays float32.
+    """
+    p=np.asarray(p, dtype=np.result_type(*arrays.values()) if arrays else float)
+    ids=wells["Well"].to_numpy() if "Well" in wells.columns else wells.index.to_numpy()
+    table={
+        "Well": np.repeat(ids, len(p)),
+        "Pressure(psia)": np.tile(p, len(wells)),
+    }
+    for name, values in arrays.items():
+        table[COLUMNS[name]]=np.broadcast_to(values, (len(wells), len(p))).ravel()
+    return pd.DataFrame(table)
+
+
+def run_batch(wells, p, props=PROPERTIES, **correlations):
+    """Long-format table of ``props`` for every (well, pressure) pair."""
+    return to_long(wells, p, batch_arrays(wells, p, props, **correlations))
+
+
+def precision_report(wells, p, dtype="float32", engine="numpy"):
+    """Relative error of every correlation computed in ``dtype`` against float64.
+
+    One row per correlation of every property, with the largest and mean
+    relative difference over all (well, pressure) values of ``wells``.
+    """
+    rows=[]
+    for prop, key, label, registry in [
+        ("rs", "rs", "Rs", RS_CORRELATIONS),
+        ("pb", "pb", "Pb", PB_CORRELATIONS),
+        ("bo", "bo", "Bo", BO_CORRELATIONS),
+        ("co", "co", "Co", CO_CORRELATIONS),
+        ("uo", "uod", "Dead oil viscosity", UOD_CORRELATIONS),
+        ("uo", "uob", "Saturated oil viscosity", UOB_CORRELATIONS),
+    ]:
+        ## measured Pb would hide the Pb correlation
+        table=wells.drop(columns="Pb", errors="ignore") if prop=="pb" else wells
+        for name in registry:
+            ref=batch_arrays(table, p, (prop,), engine=engine, **{key: name})[prop]
+            low=batch_arrays(table, p, (prop,), engine=engine, dtype=dtype, **{key: name})[prop]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                err=np.abs(low.astype(np.float64)-ref)/np.abs(ref)
+            err=err[np.isfinite(err)]
+            rows.append({"Property": label, "Correlation": name,
+                         "Max relative error": err.max() if err.size else np.nan,
+                         "Mean relative error": err.mean() if err.size else np.nan})
+    return pd.DataFrame(rows)
@@ -0,0 +1,66 @@
+"""Bubble-point pressure (Pb) correlations from the solution GOR.
+
+Like :mod:`pvt.solubility`, the formulas are kernels over the derived fluid
+terms so :func:`Pb_compare` shares them across all four correlations.
+"""
+
+from pvt.common import Yo, Ygs, Rankine, standing_10x, petrosky_10x, switch
+
+
+def _beggs_coefficients(api):
+    low=api<30
+    return switch(low, 27.624, 56.18, api), switch(low, 0.914328, 0.84246, api), switch(low, 11.172, 10.393, api)
+
+
+## kernels over precomputed terms --------------------------------------------------
+
+def _standing(rs, yg, ten_x):
+    ## Standing's 10**a with a=-x
+    return 18.2*((rs/yg)**0.83/ten_x-1.4)
+
+
+def _beggs(rs, api, ygs, TR):
+    C1, C2, C3 = _beggs_coefficients(api)
+    return ((C1*rs/ygs)*10**(-C3*api/TR))**C2
+
+
+def _marhoun(rs, yg, yo, TR):
+    a, b, c, d, e = 5.38088*10**(-3), 0.715082, -1.87784, 3.1437, 1.32657
+    return a*rs**b*yg**c*yo**d*TR**e
+
+
+def _petrosky(rs, yg, ten_x):
+    return 112.727*rs**0.577421/(yg**0.8439*ten_x)-1391.051
+
+
+## public correlations --------------------------------------------------------------
+
+def Pb_standing(rs, api, yg, T):
+    """Standing (1947). Returns psia; T in °F."""
+    return _standing(rs, yg, standing_10x(api, T))
+
+
+def Pb_beggs(rs, api, yg, T, psep, tsep):
+    """Vasquez-Beggs (1980). T and tsep in °F, psep in psig."""
+    return _beggs(rs, api, Ygs(yg, api, psep, tsep), Rankine(T))
+
+
+def Pb_marhouns(rs, api, yg, T):
+    """Marhoun (1988). T in °F."""
+    return _marhoun(rs, yg, Yo(api), Rankine(T))
+
+
+def Pb_petrosky(rs, api, yg, T):
+    """Petrosky-Farshad (1993). T in °F."""
+    return _petrosky(rs, yg, petrosky_10x(api, T))
+
+
+def Pb_compare(rs, api, yg, T, psep, tsep):
+    """All four Pb correlations in one pass, keyed by correlation name."""
+    TR=Rankine(T)
+    return {
+        "Standing": _standing(rs, yg, standing_10x(api, T)),
+        "Vasquez-Beggs": _beggs(rs, api, Ygs(yg, api, psep, tsep), TR),
+        "Marhoun": _marhoun(rs, yg, Yo(api), TR),
+        "Petrosky-Farshad": _petrosky(rs, yg, petrosky_10x(api, T)),
+    }
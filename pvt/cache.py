@@ -0,0 +1,178 @@
+"""Bounded LRU cache for computed PVT curves.
+
+The Streamlit pages rerun top to bottom on every widget change.  Wrapping a
+correlation call in :func:`cached_curve` keys it on the function and its full
+input tuple (arrays and pandas objects are keyed by a digest of their
+contents), so reruns triggered by unrelated widgets reuse the stored curve.
+The cache lives at module level and is shared by every session in the
+server process; it is guarded by a lock and evicts least-recently-used
+entries beyond ``maxsize`` entries or ``maxbytes`` bytes (arrays by
+``nbytes``, pandas objects by their memory usage).  ``PVT_CACHE_MB`` sets the
+byte limit of the shared :data:`curves` cache.
+
+Since every session gets the same stored value, cached arrays are made
+read-only (arrays that are views of something else, such as the function's
+own input, are copied first) and pandas objects are copied on every hit.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo=namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize", "maxbytes", "currbytes"])
+
+## byte limit of the shared curve cache
+MAX_BYTES=int(float(os.environ.get("PVT_CACHE_MB", "256"))*2**20)
+
+
+def _digest(values):
+    values=np.ascontiguousarray(values)
+    if values.dtype==object:
+        return hashlib.blake2b(repr(values.tolist()).encode(), digest_size=16).hexdigest()
+    return hashlib.blake2b(values.view(np.uint8), digest_size=16).hexdigest()
+
+
+def _freeze(value):
+    ## turn one argument into something hashable that changes whenever its contents do
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, _digest(value))
+    if hasattr(value, "to_numpy") and hasattr(value, "index"):
+        labels=list(value.columns) if hasattr(value, "columns") else getattr(value, "name", None)
+        return (type(value).__name__, repr(labels),
+                _digest(value.to_numpy()), _digest(value.index.to_numpy()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,)+tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return ("dict",)+tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def make_key(func, args, kwargs):
+    """Hashable key for ``func(*args, **kwargs)``."""
+    return (func.__module__, func.__qualname__, _freeze(args), _freeze(kwargs))
+
+
+def _is_pandas(value):
+    return hasattr(value, "to_numpy") and hasattr(value, "index")
+
+
+def _nbytes(value):
+    ## memory held by a cached value
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if _is_pandas(value):
+        return int(np.sum(value.memory_usage(index=True, deep=True)))
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _array_ids(value):
+    ## ids of the arrays among the call's arguments
+    if isinstance(value, np.ndarray):
+        return {id(value)}
+    if isinstance(value, dict):
+        value=list(value.values())
+    if isinstance(value, (list, tuple)):
+        return set().union(*map(_array_ids, value))
+    return set()
+
+
+def _rebuild(value, func):
+    ## a tuple, namedtuple, list or dict with ``func`` applied to its items
+    if isinstance(value, dict):
+        return {k: func(v) for k, v in value.items()}
+    if hasattr(value, "_make"):
+        return value._make(func(v) for v in value)
+    return type(value)(func(v) for v in value)
+
+
+def _store(value, inputs):
+    ## the value as kept in the cache: arrays it owns, read-only; no pandas object a caller still holds
+    if isinstance(value, np.ndarray):
+        if value.base is not None or id(value) in inputs:
+            value=value.copy()
+        value.flags.writeable=False
+        return value
+    if _is_pandas(value):
+        return value.copy()
+    if isinstance(value, (list, tuple, dict)):
+        return _rebuild(value, lambda v: _store(v, inputs))
+    return value
+
+
+def _serve(value):
+    ## what a caller gets: the read-only arrays themselves, fresh containers and pandas copies
+    if _is_pandas(value):
+        return value.copy()
+    if isinstance(value, (list, tuple, dict)):
+        return _rebuild(value, _serve)
+    return value
+
+
+class LRUCache:
+    """Thread-safe mapping with least-recently-used eviction and hit/miss counters.
+
+    Entries are evicted beyond ``maxsize`` entries or ``maxbytes`` bytes; a
+    value larger than ``maxbytes`` on its own is returned but not kept.
+    """
+
+    def __init__(self, maxsize=256, maxbytes=MAX_BYTES):
+        self.maxsize=maxsize
+        self.maxbytes=maxbytes
+        self.hits=0
+        self.misses=0
+        self.nbytes=0
+        self._data=OrderedDict()
+        self._lock=threading.Lock()
+
+    def get_or_compute(self, key, compute, inputs=()):
+        """The value stored under ``key``, or ``compute()`` stored; ``inputs`` are the arguments it was computed from."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits+=1
+                return _serve(self._data[key][0])
+            self.misses+=1
+        ## compute outside the lock so one slow curve does not block other sessions
+        value=_store(compute(), _array_ids(inputs))
+        size=_nbytes(value)
+        if size<=self.maxbytes:
+            with self._lock:
+                old=self._data.pop(key, None)
+                if old is not None:
+                    self.nbytes-=old[1]
+                self._data[key]=(value, size)
+                self.nbytes+=size
+                while len(self._data)>self.maxsize or self.nbytes>self.maxbytes:
+                    self.nbytes-=self._data.popitem(last=False)[1][1]
+        return _serve(value)
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data), self.maxbytes, self.nbytes)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits=self.misses=self.nbytes=0
+
+
+curves=LRUCache(maxsize=256)
+
+
+def cached_curve(func, *args, **kwargs):
+    """``func(*args, **kwargs)``, served from the shared curve cache when possible.
+
+    Cached arrays are returned read-only; copy before modifying them.
+    Containers and pandas objects are fresh copies on every call.
+    """
+    return curves.get_or_compute(make_key(func, args, kwargs), lambda: func(*args, **kwargs), (args, kwargs))
@@ -0,0 +1,163 @@
+"""Incremental recompute of the pages' correlation chains.
+
+The Viscosity page is a strict pipeline: dead-oil uod feeds the saturated
+uob, whose value at the bubble point feeds the undersaturated uo.  The
+Formation Volume Factor page has the same shape, from Bo below Pb to bob
+and on to Bo above Pb.  A :class:`Chain` models such a pipeline as a small
+dependency graph of stages; each stage has one or more correlations, and
+each correlation names its inputs, which are either page inputs or other
+stages.
+
+Every page input and every computed stage carries a version.  Inputs get a
+new version only when their contents change (arrays and pandas objects are
+compared by digest, as in :mod:`pvt.cache`), and a stage is recomputed only
+when the versions it was last computed from have moved, so changing the
+reservoir pressure recomputes the undersaturated stage alone.  A stage
+whose recomputed value comes out unchanged keeps its version, and the
+stages below it stay valid.  The correlations still go through
+:func:`pvt.cache.cached_curve`, so sessions keep sharing results.
+"""
+
+import functools
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from pvt.cache import _freeze, cached_curve
+from pvt.fvf import (
+    Bo_Standing,
+    Bo_Vasquez_Beggs,
+    Bo_Glaso,
+    Bo_Marhoun,
+    Bo_Petrosky_Farshad,
+    Bo_MBE,
+    above_pb_Vasquez_Beggs,
+    above_pb_Petrosky_Farshad,
+)
+from pvt.viscosity import uod_Beal, uod_Beggs_Robinson, uod_Glaso, uob_Chew_Connally, uob_Beggs_Robinson, uo_Vasquez_Beggs
+
+## name -> {correlation: (function, input names)}; an input name is a page input or another stage
+Stage=namedtuple("Stage", ["name", "correlations"])
+
+
+def _curve(func):
+    return functools.partial(cached_curve, func)
+
+
+def at_bubble_point(values):
+    """The last point of a curve computed up to Pb (its value at Pb); a scalar is returned as is."""
+    values=np.asarray(values)
+    return values.item() if values.ndim==0 else values.ravel()[-1].item()
+
+
+VISCOSITY=(
+    Stage("uod", {
+        "Beal": (_curve(uod_Beal), ("api", "T")),
+        "Beggs-Robinson": (_curve(uod_Beggs_Robinson), ("api", "T")),
+        "Glaso": (_curve(uod_Glaso), ("api", "T")),
+    }),
+    Stage("uob", {
+        "Chew-Connally": (_curve(uob_Chew_Connally), ("rs", "uod")),
+        "Beggs-Robinson": (_curve(uob_Beggs_Robinson), ("rs", "uod")),
+    }),
+    Stage("uob_pb", {"At Pb": (at_bubble_point, ("uob",))}),
+    Stage("uo", {"Vasquez-Beggs": (_curve(uo_Vasquez_Beggs), ("p", "pb", "uob_pb"))}),
+)
+
+FVF=(
+    Stage("bo", {
+        "Standing": (_curve(Bo_Standing), ("rs", "api", "yg", "T", "coef_Standing")),
+        "Vasquez-Beggs": (_curve(Bo_Vasquez_Beggs), ("rs", "api", "yg", "T", "psep", "tsep")),
+        "Glaso": (_curve(Bo_Glaso), ("rs", "api", "yg", "T")),
+        "Marhoun": (_curve(Bo_Marhoun), ("rs", "api", "yg", "T", "coef_Marhoun")),
+        "Petrosky-Farshad": (_curve(Bo_Petrosky_Farshad), ("rs", "api", "yg", "T")),
+        "Material Balance Equation": (_curve(Bo_MBE), ("rs", "api", "yg", "rho_o")),
+    }),
+    Stage("bob", {"At Pb": (at_bubble_point, ("bo",))}),
+    Stage("bo_above", {
+        "Vasquez-Beggs": (_curve(above_pb_Vasquez_Beggs),
+                          ("p", "pb", "bob", "rsb", "api", "yg", "T", "psep", "tsep")),
+        "Petrosky-Farshad": (_curve(above_pb_Petrosky_Farshad), ("p", "pb", "bob", "rsb", "api", "yg", "T")),
+    }),
+)
+
+
+class Chain:
+    """Stages memoized on the versions of their inputs; only stale stages are recomputed."""
+
+    def __init__(self, stages):
+        self.stages={stage.name: stage for stage in stages}
+        ## the correlation whose value feeds the stages below, the first one until select() says otherwise
+        self.selected={stage.name: next(iter(stage.correlations)) for stage in stages}
+        ## (stage, correlation) -> number of times it was computed
+        self.computed=Counter()
+        self._inputs={}
+        self._memo={}
+        self._clock=0
+
+    def _tick(self):
+        self._clock+=1
+        return self._clock
+
+    def update(self, **inputs):
+        """Set page inputs; an input keeps its version when its contents are unchanged."""
+        for name, value in inputs.items():
+            if name in self.stages:
+                raise ValueError(f"{name!r} is a stage, not an input")
+            frozen=_freeze(value)
+            old=self._inputs.get(name)
+            version=old[2] if old is not None and old[1]==frozen else self._tick()
+            self._inputs[name]=(value, frozen, version)
+
+    def select(self, stage, correlation):
+        """Make ``correlation`` the one feeding the stages below ``stage`` and return its value."""
+        self._correlation(stage, correlation)
+        self.selected[stage]=correlation
+        return self.value(stage)
+
+    def value(self, stage, correlation=None):
+        """``stage`` computed with ``correlation`` (default: the selected one), recomputing only what is stale."""
+        return self._compute(stage, self._correlation(stage, correlation or self.selected.get(stage)))[0]
+
+    def _correlation(self, stage, correlation):
+        if stage not in self.stages:
+            raise ValueError(f"unknown stage {stage!r} (choose from {', '.join(self.stages)})")
+        correlations=self.stages[stage].correlations
+        if correlation not in correlations:
+            raise ValueError(f"unknown {stage} correlation {correlation!r} (choose from {', '.join(correlations)})")
+        return correlation
+
+    def _compute(self, stage, correlation):
+        ## (value, version), pulling the stages above first
+        func, names=self.stages[stage].correlations[correlation]
+        args=[]
+        key=[]
+        for name in names:
+            if name in self.stages:
+                value, version=self._compute(name, self.selected[name])
+            elif name in self._inputs:
+                value, _, version=self._inputs[name]
+            else:
+                raise ValueError(f"input {name!r} of stage {stage!r} has not been set")
+            args.append(value)
+            key.append(version)
+        key=tuple(key)
+        memo=self._memo.get((stage, correlation))
+        if memo is not None and memo[0]==key:
+            return memo[1], memo[2]
+        value=func(*args)
+        self.computed[(stage, correlation)]+=1
+        ## early cutoff: an unchanged result does not invalidate the stages below
+        version=memo[2] if memo is not None and _freeze(memo[1])==_freeze(value) else self._tick()
+        self._memo[(stage, correlation)]=(key, value, version)
+        return value, version
+
+
+def session_chain(stages, key):
+    """The session's :class:`Chain` for ``stages``, kept in ``st.session_state[key]`` across reruns."""
+    import streamlit as st
+
+    chain=st.session_state.get(key)
+    if chain is None:
+        chain=st.session_state[key]=Chain(stages)
+    return chain
@@ -0,0 +1,209 @@
+"""Command-line interface: ``python -m pvt batch in.csv out.csv``.
+
+The batch command streams the well table in fixed-size chunks, runs each
+chunk through :func:`pvt.batch.run_batch` and appends the long-format rows
+to the output, so memory use depends on the chunk size, not the input size.
+Input and output may each be CSV, Parquet or Arrow, chosen by file suffix
+or ``--input-format``/``--output-format``.
+
+The sweep command fills a memory-mapped sensitivity cube (:mod:`pvt.sweep`)
+and resumes an interrupted sweep when rerun with the same arguments.
+
+The serve command runs the HTTP/JSON API of :mod:`pvt.server`.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from pvt.batch import (
+    DTYPES,
+    ENGINES,
+    PROPERTIES,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+    run_batch,
+    to_long,
+)
+from pvt.io import FrameWriter, iter_table
+from pvt.parallel import BatchPool, parallel_batch_arrays
+from pvt.sweep import sweep
+
+
+def _props(value):
+    props=tuple(v.strip() for v in value.split(",") if v.strip())
+    unknown=[v for v in props if v not in PROPERTIES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown properties {', '.join(unknown)} (choose from {','.join(PROPERTIES)})")
+    return props
+
+
+def _axis(value):
+    ## NAME=start:stop:step (stop included) or NAME=v1,v2,...
+    name, sep, spec = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=start:stop:step or NAME=v1,v2,..., got '{value}'")
+    try:
+        if ":" in spec:
+            start, stop, step = (float(v) for v in spec.split(":"))
+            values=pressure_range(start, stop, step)
+        else:
+            values=[float(v) for v in spec.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad values in '{value}'") from None
+    return name.strip(), list(values)
+
+
+def _fixed(value):
+    name, sep, number = value.partition("=")
+    try:
+        return name.strip(), float(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=value, got '{value}'") from None
+
+
+def _variant(value):
+    ## LABEL or LABEL:rs=Standing,bo=Marhoun
+    label, _, spec = value.partition(":")
+    correlations={}
+    for item in filter(None, spec.split(",")):
+        key, sep, name = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected LABEL:prop=correlation,..., got '{value}'")
+        correlations[key.strip()]=name.strip()
+    return label, correlations
+
+
+def _pressure_options(parser):
+    parser.add_argument("--pmin", type=float, default=500, help="first pressure, psia (default: 500)")
+    parser.add_argument("--pmax", type=float, default=5000, help="last pressure, psia (default: 5000)")
+    parser.add_argument("--step", type=float, default=10, help="pressure step, psi (default: 10)")
+
+
+def build_parser():
+    parser=argparse.ArgumentParser(prog="pvt", description="Headless PVT correlations.")
+    sub=parser.add_subparsers(dest="command", required=True)
+
+    batch=sub.add_parser("batch", help="compute PVT curves for a CSV table of wells")
+    batch.add_argument("input", help="CSV, Parquet or Arrow table with columns API, Yg, T, Psep, Tsep, Rsb "
+                                     "and optionally Well, Pb")
+    batch.add_argument("output", help="long-format CSV, Parquet or Arrow file to write ('-' for CSV on stdout)")
+    batch.add_argument("--input-format", choices=["csv", "parquet", "arrow"], default=None,
+                       help="input format (default: from the file suffix, else csv)")
+    batch.add_argument("--output-format", choices=["csv", "parquet", "arrow"], default=None,
+                       help="output format (default: from the file suffix, else csv)")
+    batch.add_argument("--props", type=_props, default=PROPERTIES,
+                       help=f"comma-separated properties (default: {','.join(PROPERTIES)})")
+    _pressure_options(batch)
+    batch.add_argument("--chunksize", type=int, default=1000,
+                       help="wells read and computed per chunk (default: 1000)")
+    batch.add_argument("--workers", type=int, default=1,
+                       help="worker processes, shared by all chunks, 0 for one per CPU (default: 1)")
+    batch.add_argument("--task-size", type=int, default=None,
+                       help="wells per worker task (default: about four tasks per worker)")
+    for name, registry, default in [
+        ("rs", RS_CORRELATIONS, "Standing"),
+        ("pb", PB_CORRELATIONS, "Standing"),
+        ("bo", BO_CORRELATIONS, "Standing"),
+        ("co", CO_CORRELATIONS, "Vasquez-Beggs"),
+        ("uod", UOD_CORRELATIONS, "Beal"),
+        ("uob", UOB_CORRELATIONS, "Chew-Connally"),
+    ]:
+        batch.add_argument(f"--{name}-correlation", dest=name, choices=list(registry), default=default)
+    batch.add_argument("--precision", choices=list(DTYPES), default="float64",
+                       help="compute and write in this float type; float32 halves memory (default: float64)")
+    batch.add_argument("--engine", choices=list(ENGINES), default="numpy",
+                       help="numba: compiled kernels, fused: numexpr-style expressions; "
+                            "both fall back to NumPy when not installed (default: numpy)")
+
+    cube=sub.add_parser("sweep", help="fill a memory-mapped sensitivity cube, resuming if interrupted")
+    cube.add_argument("directory", help="directory for values.npy and meta.json")
+    cube.add_argument("--axis", type=_axis, action="append", required=True,
+                      help="swept input, e.g. T=150:300:10 or API=30,35,40 (repeatable)")
+    cube.add_argument("--fixed", type=_fixed, action="append", default=[],
+                      help="fixed input, e.g. Rsb=751 (repeatable)")
+    cube.add_argument("--variant", type=_variant, action="append", default=None,
+                      help="correlation variant, e.g. Marhoun:bo=Marhoun (repeatable; default: the batch defaults)")
+    cube.add_argument("--props", type=_props, default=("rs", "bo"), help="comma-separated properties (default: rs,bo)")
+    cube.add_argument("--block-rows", type=int, default=None, help="input combinations per block")
+    cube.add_argument("--precision", choices=list(DTYPES), default="float64",
+                      help="float type of the cube on disk (default: float64)")
+    _pressure_options(cube)
+
+    server=sub.add_parser("serve", help="serve the correlations as an HTTP/JSON API")
+    server.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    server.add_argument("--port", type=int, default=8000, help="port to listen on, 0 for any free port (default: 8000)")
+    server.add_argument("--quiet", action="store_true", help="do not log every request")
+    server.add_argument("--max-cells", type=int, default=None,
+                        help="reject requests whose result has more values per array, with status 413 "
+                             "(default: PVT_MAX_CELLS or 10000000)")
+    return parser
+
+
+def pressure_range(pmin, pmax, step):
+    """Pressures from pmin to pmax inclusive, step psi apart."""
+    return np.arange(pmin, pmax+step/2, step)
+
+
+def run_batch_command(args):
+    p=pressure_range(args.pmin, args.pmax, args.step)
+    correlations={k: getattr(args, k) for k in ("rs", "pb", "bo", "co", "uod", "uob")}
+    correlations["engine"]=args.engine
+    correlations["dtype"]=args.precision
+    wells=0
+    ## one worker pool for every chunk
+    pool=BatchPool(args.workers or None) if args.workers!=1 else None
+    try:
+        with FrameWriter(args.output, args.output_format) as out:
+            for chunk in iter_table(args.input, args.chunksize, args.input_format, dtype=args.precision):
+                if pool is None:
+                    result=run_batch(chunk, p, args.props, **correlations)
+                else:
+                    arrays=parallel_batch_arrays(chunk, p, args.props, chunk_size=args.task_size, pool=pool,
+                                                 **correlations)
+                    result=to_long(chunk, p, arrays)
+                out.write(result)
+                wells+=len(chunk)
+    finally:
+        if pool is not None:
+            pool.close()
+    print(f"{wells} wells x {len(p)} pressures written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def run_sweep_command(args):
+    p=pressure_range(args.pmin, args.pmax, args.step)
+    variants=dict(args.variant) if args.variant else None
+
+    def progress(done, total):
+        print(f"\rblock {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    cube=sweep(args.directory, dict(args.axis), p, args.props, dict(args.fixed), variants,
+               args.block_rows, progress=progress, dtype=args.precision)
+    print(f"\n{args.directory}: {' x '.join(map(str, cube.values.shape))} "
+          f"(variant, property, {', '.join(cube.meta['axes'])}, pressure)", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    args=build_parser().parse_args(argv)
+    try:
+        if args.command=="batch":
+            return run_batch_command(args)
+        if args.command=="sweep":
+            return run_sweep_command(args)
+        if args.command=="serve":
+            from pvt.server import MAX_CELLS, serve
+
+            serve(args.host, args.port, args.quiet, args.max_cells or MAX_CELLS)
+            return 0
+    except (OSError, ValueError) as err:
+        print(f"pvt: error: {err}", file=sys.stderr)
+        return 1
+    return 0
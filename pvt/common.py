@@ -0,0 +1,39 @@
+"""Fluid properties shared by several correlations."""
+
+import numpy as np
+
+
+def switch(condition, a, b, like):
+    """np.where between two constants, in the floating dtype of ``like``.
+
+    Keeps float32 inputs in float32 instead of promoting them to float64.
+    """
+    return np.where(condition, a, b).astype(np.result_type(like, 1.0), copy=False)
+
+
+def Yo(api):
+    """Stock-tank oil specific gravity from API gravity."""
+    return 141.5/(131.5+api)
+
+
+def Ygs(yg, api, psep, tsep):
+    """Gas gravity corrected to the 100 psig reference separator.
+
+    psep in psig, tsep in °F (Vasquez-Beggs).
+    """
+    return yg*(1+5.912*10**(-5)*api*tsep*np.log10((psep+14.7)/114.7))
+
+
+def Rankine(T):
+    """°F to °R."""
+    return T+460
+
+
+def standing_10x(api, T):
+    """Standing's temperature/gravity term 10**x, x=0.0125*API-0.00091*T (T in °F)."""
+    return 10**(0.0125*api-0.00091*T)
+
+
+def petrosky_10x(api, T):
+    """Petrosky-Farshad's temperature/gravity term 10**x (T in °F)."""
+    return 10**(7.916*10**(-4)*api**1.5410-4.561*10**(-5)*T**1.3911)
@@ -0,0 +1,177 @@
+"""Uploaded datasets shared by the pages, parsed once per distinct content.
+
+The Bubble-point, FVF and Viscosity pages read the same pressure/Rs files.
+A :class:`DatasetRegistry` keys every upload by a digest of its bytes, so
+the same file uploaded again, on any page and under any name, finds the
+existing entry instead of storing a second copy.  The typed columns parsed
+by :func:`pvt.io.read_columns` are kept per column set, so a page asking for
+columns another page has already parsed gets the same DataFrame back with
+no parse and no copy.  Treat returned frames as read-only.
+
+Each session has its own registry (:func:`session_registry`).  With
+``PVT_SHARED_DATASETS=1`` every session uses the process-wide :data:`shared`
+registry instead, so a file uploaded by one user is offered to all of them.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from pvt.io import PRESSURE_RS_COLUMNS, _format, file_format, read_columns
+
+## share uploads between every session in the server process instead of keeping them per session
+SHARED=os.environ.get("PVT_SHARED_DATASETS", "")=="1"
+
+Dataset=namedtuple("Dataset", ["key", "name", "format", "size"])
+
+
+def content_key(data):
+    """Digest identifying the bytes ``data`` by content."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _bytes(source):
+    ## the file's bytes; an in-memory upload hands over its buffer without copying it
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        source.seek(0)
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+class DatasetRegistry:
+    """Uploaded files keyed by content digest, with their parsed columns.
+
+    The least recently used datasets beyond ``maxsize`` are dropped.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize=maxsize
+        ## files read and column sets parsed, for checking that duplicates cost nothing
+        self.reads=0
+        self.parses=0
+        self._entries=OrderedDict()
+        self._ids={}
+        self._lock=threading.Lock()
+
+    def add(self, source, name=None, ext="csv", upload_id=None):
+        """Register ``source`` (bytes, a path or a file-like upload) and return its key.
+
+        Content already in the registry is not stored again.  ``upload_id``
+        (a Streamlit upload's ``id``) lets reruns skip hashing an upload seen
+        before.  The dataset's format is detected once, when it is first
+        added, from the suffix of ``name``, falling back to ``ext``.
+        """
+        fmt=_format(file_format(name or "", ext))
+        with self._lock:
+            key=self._ids.get(upload_id)
+            if key not in self._entries:
+                data=_bytes(source)
+                key=content_key(data)
+                self.reads+=1
+                if key not in self._entries:
+                    self._entries[key]={"name": name or key[:8], "format": fmt, "data": data, "frames": {}}
+                if upload_id is not None:
+                    self._ids[upload_id]=key
+            self._entries.move_to_end(key)
+            while len(self._entries)>self.maxsize:
+                dropped, _=self._entries.popitem(last=False)
+                self._ids={i: k for i, k in self._ids.items() if k!=dropped}
+        return key
+
+    def frame(self, key, columns=PRESSURE_RS_COLUMNS, dtype=np.float64, fmt=None):
+        """``columns`` of dataset ``key`` as floats, parsed on the first request only.
+
+        ``fmt`` parses the file as that format instead of the detected one.
+        """
+        columns=tuple(columns)
+        with self._lock:
+            entry=self._entries.get(key)
+            if entry is None:
+                raise ValueError(f"unknown dataset {key!r} (choose from {', '.join(self._entries)})")
+            cache_key=(_format(fmt) if fmt else entry["format"], columns, np.dtype(dtype).str)
+            frame=entry["frames"].get(cache_key)
+        if frame is None:
+            frame=read_columns(io.BytesIO(entry["data"]), columns, ext=cache_key[0], dtype=dtype)
+            with self._lock:
+                frame=entry["frames"].setdefault(cache_key, frame)
+                self.parses+=1
+        return frame
+
+    def datasets(self):
+        """The registered datasets, least recently used first."""
+        with self._lock:
+            return [Dataset(key, e["name"], e["format"], len(e["data"])) for key, e in self._entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ids.clear()
+            self.reads=self.parses=0
+
+    def __getstate__(self):
+        ## session state may be copied or pickled; the lock is recreated
+        state=self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock=threading.Lock()
+
+
+shared=DatasetRegistry(maxsize=32)
+
+
+def session_registry(key="datasets"):
+    """This session's registry, or :data:`shared` when ``PVT_SHARED_DATASETS=1``."""
+    if SHARED:
+        return shared
+    import streamlit as st
+
+    registry=st.session_state.get(key)
+    if registry is None:
+        registry=st.session_state[key]=DatasetRegistry()
+    return registry
+
+
+def choose_dataset(upload, ext, columns=PRESSURE_RS_COLUMNS, key="dataset"):
+    """(name, DataFrame) of the dataset picked on the page, or (None, None).
+
+    A new ``upload`` is registered and picked; a selectbox offers every
+    dataset uploaded so far, on this page or any other, starting from the
+    one picked last.  ``ext``, the file type chosen on the page, applies to
+    the page's own upload; other datasets keep their detected format.  Each
+    page passes its own ``key`` so its pick does not move another page's.
+    """
+    import streamlit as st
+
+    registry=session_registry()
+    added=None
+    if upload is not None:
+        added=registry.add(upload, upload.name, ext, upload.id)
+        ## a fresh upload is picked once; after that the selectbox decides
+        if st.session_state.get(key+'_upload')!=upload.id:
+            st.session_state[key+'_upload']=upload.id
+            st.session_state[key]=added
+    datasets={d.key: d for d in registry.datasets()}
+    if not datasets:
+        return None, None
+    options=[None]+list(datasets)[::-1]
+    current=st.session_state.get(key)
+    picked=st.selectbox('Dataset', options, index=options.index(current) if current in options else 0,
+                        format_func=lambda k: 'No dataset' if k is None else
+                        f'{datasets[k].name} ({datasets[k].size/2**20:.1f} MB)',
+                        help='Files uploaded so far, on any page; identical files are stored once.')
+    st.session_state[key]=picked
+    if picked is None:
+        return None, None
+    return datasets[picked].name, registry.frame(picked, columns, fmt=ext if picked==added else None)
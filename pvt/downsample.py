@@ -0,0 +1,45 @@
+"""Shape-preserving downsampling of curves for display."""
+
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points that keep the curve's shape.
+
+    ``x`` must be sorted.  The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle
+    with the previously kept point and the mean of the next bucket.
+    """
+    x=np.asarray(x, dtype=float)
+    y=np.asarray(y, dtype=float)
+    n=len(x)
+    if n_out>=n or n_out<3:
+        return np.arange(n)
+
+    edges=np.linspace(1, n-1, n_out-1).astype(int)
+    keep=np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n-1
+    a=0
+    for i in range(n_out-2):
+        lo, hi = edges[i], edges[i+1]
+        ## average of the next bucket (the last point for the final bucket)
+        nlo, nhi = hi, edges[i+2] if i+2<len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area=np.abs((x[a]-cx)*(y[lo:hi]-y[a])-(x[a]-x[lo:hi])*(cy-y[a]))
+        a=lo+int(np.argmax(area))
+        keep[i+1]=a
+    return keep
+
+
+def downsample(x, y, max_points):
+    """``(x, y)`` reduced to at most ``max_points`` with :func:`lttb` (sorted by x first)."""
+    x=np.asarray(x, dtype=float)
+    y=np.asarray(y, dtype=float)
+    if len(x)<=max_points:
+        return x, y
+    finite=np.isfinite(x)&np.isfinite(y)
+    x, y = x[finite], y[finite]
+    order=np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    keep=lttb(x, y, max_points)
+    return x[keep], y[keep]
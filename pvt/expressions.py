@@ -0,0 +1,190 @@
+"""Correlations written once as expression strings and evaluated fused.
+
+Each Rs, Bo and live-oil viscosity correlation is registered here under the
+same name as in :mod:`pvt.batch` as an :class:`Expression`: a few ``terms``
+that depend on the fluid alone, evaluated first at the fluid's own (usually
+one value per well) shape, and a ``body`` evaluated over the full
+(wells x pressures) grid.  By default the body is evaluated by NumPy one
+block of rows at a time on a thread pool, so every intermediate is a
+cache-sized block instead of a full-grid temporary while NumPy's SIMD
+math functions still do the work.  numexpr, which compiles the string to
+its own virtual machine, is used instead when it is installed with Intel
+VML; without VML its scalar ``pow`` is slower than NumPy's.
+
+:func:`fused` maps a NumPy correlation to a function with the same
+signature that evaluates its expression, or returns it unchanged when it
+has none; there is no compile step.
+"""
+
+import functools
+import inspect
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:  # pragma: no cover - numexpr is optional
+    numexpr=None
+
+from pvt.batch import RS_CORRELATIONS, BO_CORRELATIONS, UOB_CORRELATIONS
+
+## grid elements per block, small enough that the temporaries stay in cache
+BLOCK_ELEMENTS=1<<14
+THREADS=os.cpu_count() or 1
+USE_NUMEXPR=numexpr is not None and numexpr.use_vml
+
+Expression=namedtuple("Expression", ["body", "terms", "coef"], defaults=({}, ()))
+Expression.__doc__="""A correlation as expression strings.
+
+body   expression over the grid, in the correlation's argument names and terms
+terms  {name: expression} depending on the fluid only, evaluated in order first
+coef   names the ``coef`` tuple argument is unpacked into, if the correlation has one
+"""
+
+_YO="(141.5/(131.5+api))"
+_YGS="yg*(1+5.912e-05*api*tsep*log10((psep+14.7)/114.7))"
+## np.minimum(p, pb), NaN in either propagating: pb=None is passed as inf
+_P="where(p>pb, pb, where(pb!=pb, pb, p))"
+
+RS_EXPRESSIONS={
+    "Standing": Expression(f"yg*((({_P}/18.2+1.4)*ten_x)**1.2048)",
+                           {"ten_x": "10**(0.0125*api-0.00091*T)"}),
+    "Vasquez-Beggs": Expression(f"c1_ygs*({_P}**c2)*e", {
+        "c1_ygs": f"where(api<30, 0.0362, 0.0178)*{_YGS}",
+        "c2": "where(api<30, 1.0937, 1.1870)",
+        "e": "exp(where(api<30, 25.7240, 23.931)*(api/(T+460)))",
+    }),
+    "Marhoun": Expression(f"(k*{_P})**1.398441",
+                          {"k": f"185.843208*yg**1.877840*{_YO}**-3.1437*(T+460)**-1.3265"}),
+    "Petrosky-Farshad": Expression(f"(({_P}/112.727+12.340)*g*ten_x)**1.73184", {
+        "g": "yg**0.8439",
+        "ten_x": "10**(7.916e-04*api**1.5410-4.561e-05*T**1.3911)",
+    }),
+}
+BO_EXPRESSIONS={
+    "Standing": Expression("c0+c1*(rs*g+t)**c4", {"g": f"(yg/{_YO})**c2", "t": "c3*T"},
+                           ("c0", "c1", "c2", "c3", "c4")),
+    "Vasquez-Beggs": Expression("1.0+c1*rs+f*(c2+c3*rs)", {
+        "c1": "where(api<=30, 4.677e-04, 4.670e-04)",
+        "c2": "where(api<=30, 1.751e-05, 1.100e-05)",
+        "c3": "where(api<=30, -1.811e-08, 1.337e-09)",
+        "f": f"(T-60)*(api/({_YGS}))",
+    }),
+    "Glaso": Expression("1+10**(-6.58511+2.91329*log10(rs*g+t)-0.27683*log10(rs*g+t)**2)",
+                        {"g": f"(yg/{_YO})**0.526", "t": "0.968*T"}),
+    "Marhoun": Expression("d+d2*(rs**a*w)+d3*(rs**a*w)**2", {"w": f"yg**b*{_YO}**c", "d": "d0+d1*(T+460)"},
+                          ("a", "b", "c", "d0", "d1", "d2", "d3")),
+    "Petrosky-Farshad": Expression("1.0113+7.2046e-05*(rs**0.3738*g+t)**3.0936",
+                                   {"g": f"yg**0.2914/{_YO}**0.6265", "t": "0.24626*T**0.5371"}),
+}
+UOB_EXPRESSIONS={
+    "Chew-Connally": Expression("10**(rs*(2.2e-07*rs-7.4e-04))"
+                                "*uod**(0.68/10**(8.62e-05*rs)+0.25/10**(1.1e-03*rs)+0.062/10**(3.74e-03*rs))"),
+    "Beggs-Robinson": Expression("10.715*(rs+100)**(-0.515)*uod**(5.44*(rs+150)**(-0.338))"),
+}
+
+## NumPy correlation -> its expression
+EXPRESSIONS={}
+for _registry, _expressions in [(RS_CORRELATIONS, RS_EXPRESSIONS), (BO_CORRELATIONS, BO_EXPRESSIONS),
+                                (UOB_CORRELATIONS, UOB_EXPRESSIONS)]:
+    EXPRESSIONS.update((_registry[name], expression) for name, expression in _expressions.items())
+
+_FUNCTIONS={"__builtins__": {}, "where": np.where, "exp": np.exp, "log": np.log, "log10": np.log10}
+_POOL=None
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(source):
+    code=compile(source, "<expression>", "eval")
+    return code, frozenset(code.co_names)-set(_FUNCTIONS)
+
+
+def _blocked(source, variables):
+    ## evaluate over blocks of leading-axis rows on a thread pool; NumPy releases the GIL
+    global _POOL
+    code, names = _compile(source)
+    arrays={name: np.asarray(variables[name]) for name in names}
+    arrays={name: a.astype(np.result_type(a, 1.0), copy=False) for name, a in arrays.items()}
+    shape=np.broadcast_shapes(*(a.shape for a in arrays.values()))
+    size=int(np.prod(shape))
+    if size<=BLOCK_ELEMENTS or shape[0]==1:
+        return eval(code, _FUNCTIONS, arrays)
+    out=np.empty(shape, dtype=np.result_type(*arrays.values()))
+    rows=max(1, BLOCK_ELEMENTS//(size//shape[0]))
+
+    def block(start):
+        stop=min(start+rows, shape[0])
+        local={name: a[start:stop] if a.ndim==len(shape) and a.shape[0]!=1 else a for name, a in arrays.items()}
+        out[start:stop]=eval(code, _FUNCTIONS, local)
+
+    if THREADS==1:
+        for start in range(0, shape[0], rows):
+            block(start)
+    else:
+        if _POOL is None:
+            _POOL=ThreadPoolExecutor(THREADS)
+        list(_POOL.map(block, range(0, shape[0], rows)))
+    return out
+
+
+def _evaluate(source, variables):
+    if not USE_NUMEXPR:
+        return _blocked(source, variables)
+    names=_compile(source)[1]
+    return numexpr.evaluate(source, local_dict={name: variables[name] for name in names})
+
+
+def evaluate(expression, variables):
+    """Evaluate an :class:`Expression` given {argument name: value}."""
+    local=dict(variables)
+    ## terms take the inputs' float dtype, so constants chosen by where() keep float32 float32
+    dtype=np.result_type(*(np.asarray(v) for v in variables.values()), 1.0)
+    for name, source in expression.terms.items():
+        local[name]=np.asarray(_evaluate(source, local)).astype(dtype, copy=False)
+    return _evaluate(expression.body, local)
+
+
+_TWINS={}
+
+
+def _twin(func, expression):
+    signature=inspect.signature(func)
+
+    @functools.wraps(func)
+    def twin(*args, **kwargs):
+        bound=signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        variables=dict(bound.arguments)
+        if variables.get("pb", 0) is None:
+            variables["pb"]=np.inf
+        if expression.coef:
+            variables.update(zip(expression.coef, variables.pop("coef")))
+        return evaluate(expression, variables)
+
+    twin.__doc__=f"Fused-expression twin of :func:`{func.__module__}.{func.__name__}`."
+    return twin
+
+
+def fused(func):
+    """The fused-expression twin of a NumPy correlation, or ``func`` itself if it has none."""
+    expression=EXPRESSIONS.get(func)
+    if expression is None:
+        return func
+    if func not in _TWINS:
+        _TWINS[func]=_twin(func, expression)
+    return _TWINS[func]
+
+
+def verify(n=100_000, rtol=None, seed=0, dtype="float64", missing=False):
+    """Largest relative difference of every expression from its NumPy correlation.
+
+    See :func:`pvt.jit.verify`; raises AssertionError beyond ``rtol`` or on a
+    result of the wrong dtype.
+    """
+    from pvt.jit import verify as verify_twins
+
+    return verify_twins(n, rtol, seed, twins={func: fused(func) for func in EXPRESSIONS}, dtype=dtype,
+                        missing=missing)
@@ -0,0 +1,87 @@
+"""Oil formation volume factor (Bo) and isothermal compressibility (Co)."""
+
+import numpy as np
+
+from pvt.common import Yo, Ygs, switch
+
+
+## published coefficients; pvt.tuning fits replacements to lab data
+STANDING_BO=(0.9759, 0.000120, 0.5, 1.25, 1.2)
+MARHOUN_BO=(0.742390, 0.323294, -1.202040, 0.497069, 0.862963*10**(-3), 0.182594*10**(-2), 0.318099*10**(-5))
+
+
+## Bo at or below the bubble point ------------------------------------------------
+
+def Bo_Standing(rs, api, yg, T, coef=STANDING_BO):
+    """Standing (1947). T in °F.
+
+    ``coef`` = (c0, c1, c2, c3, c4) in c0+c1*(rs*(yg/Yo)**c2+c3*T)**c4.
+    """
+    c0, c1, c2, c3, c4 = coef
+    return c0+c1*(rs*(yg/Yo(api))**c2+c3*T)**c4
+
+
+def Bo_Vasquez_Beggs(rs, api, yg, T, psep, tsep):
+    """Vasquez-Beggs (1980). T and tsep in °F, psep in psig."""
+    ygs=Ygs(yg, api, psep, tsep)
+    low=api<=30
+    c1=switch(low, 4.677*10**(-4), 4.670*10**(-4), api)
+    c2=switch(low, 1.751*10**(-5), 1.100*10**(-5), api)
+    c3=switch(low, -1.811*10**(-8), 1.337*10**(-9), api)
+    return 1.0+c1*rs+(T-60)*(api/ygs)*(c2+c3*rs)
+
+
+def Bo_Glaso(rs, api, yg, T):
+    """Glaso (1980). T in °F."""
+    b_ob_star=rs*(yg/Yo(api))**0.526+0.968*T
+    a=-6.58511+2.91329*np.log10(b_ob_star)-0.27683*(np.log10(b_ob_star))**2
+    return 1+10**a
+
+
+def Bo_Marhoun(rs, api, yg, T, coef=MARHOUN_BO):
+    """Marhoun (1988). T in °F.
+
+    ``coef`` = (a, b, c, d0, d1, d2, d3) with F=rs**a*yg**b*Yo**c and
+    Bo=d0+d1*(T+460)+d2*F+d3*F**2.
+    """
+    a, b, c, d0, d1, d2, d3 = coef
+    F=rs**a*yg**b*Yo(api)**c
+    return d0+d1*(T+460)+d2*F+d3*F**2
+
+
+def Bo_Petrosky_Farshad(rs, api, yg, T):
+    """Petrosky-Farshad (1993). T in °F."""
+    return 1.0113+7.2046*10**(-5)*(rs**0.3738*(yg**0.2914/Yo(api)**0.6265)+0.24626*T**0.5371)**3.0936
+
+
+def Bo_MBE(rs, api, yg, rho_o):
+    """Material balance from the oil density rho_o in lb/ft^3."""
+    return (62.4*Yo(api)+0.0136*rs*yg)/rho_o
+
+
+## Co above the bubble point ------------------------------------------------------
+
+def Co_Vasquez_Beggs(p, rsb, api, yg, T, psep, tsep):
+    """Vasquez-Beggs (1980) compressibility in 1/psi. p in psia."""
+    ygs=Ygs(yg, api, psep, tsep)
+    return (-1433+5*rsb+17.2*T-1180*ygs+12.61*api)/(10.0**5*p)
+
+
+def Co_Petrosky_Farshad(p, rsb, api, yg, T):
+    """Petrosky-Farshad (1993) compressibility in 1/psi. p in psia."""
+    return 1.705*10**(-7)*rsb**0.69357*yg**0.1885*api**0.3272*T**0.6729*p**(-0.5906)
+
+
+## Bo above the bubble point ------------------------------------------------------
+
+def above_pb_Vasquez_Beggs(p, pb, bob, rsb, api, yg, T, psep, tsep):
+    """Undersaturated Bo from the bubble-point value bob (Vasquez-Beggs Co)."""
+    ygs=Ygs(yg, api, psep, tsep)
+    A=10**(-5)*(-1433+5*rsb+17.2*T-1180*ygs+12.61*api)
+    return bob*np.exp(-A*np.log(p/pb))
+
+
+def above_pb_Petrosky_Farshad(p, pb, bob, rsb, api, yg, T):
+    """Undersaturated Bo from the bubble-point value bob (Petrosky-Farshad Co)."""
+    A=4.1646*10**(-7)*rsb**0.69357*yg**0.1885*api**0.3272*T**0.6729
+    return bob*np.exp(-A*(p**0.4094-pb**0.4094))
@@ -0,0 +1,70 @@
+"""Pressure grids for evaluating PVT curves.
+
+``uniform_grid`` is the pages' fixed-step ``np.arange`` with the bubble point
+added exactly.  ``adaptive_grid`` starts from a coarse grid clustered around
+Pb and bisects only the intervals where straight-line interpolation of the
+curve misses its midpoint value by more than ``tol``, so the nearly linear
+stretches away from Pb get few points.
+"""
+
+import numpy as np
+
+
+def uniform_grid(pmin, pmax, step=1.0, pb=None):
+    """``np.arange(pmin, pmax, step)`` with ``pb`` inserted when it lies in range."""
+    p=np.arange(pmin, pmax, step, dtype=float)
+    if pb is not None and pmin<=pb<pmax:
+        p=np.union1d(p, [float(pb)])
+    return p
+
+
+def _seed(pmin, pmax, pb, min_step, n=9):
+    ## coarse uniform points plus a geometric cluster that gets denser towards pb
+    seed=[np.linspace(pmin, pmax, n)]
+    if pmin<=pb<=pmax:
+        offsets=min_step*2.0**np.arange(0, np.ceil(np.log2(max(pmax-pmin, min_step)/min_step))+1)
+        seed+=[[pb], pb-offsets, pb+offsets]
+    p=np.unique(np.concatenate(seed))
+    return p[(p>=pmin)&(p<=pmax)]
+
+
+def _midpoint_error(func, p):
+    ## relative error of linear interpolation at each interval midpoint
+    mid=(p[:-1]+p[1:])/2
+    y=np.atleast_2d(np.asarray(func(p), dtype=float))
+    ym=np.atleast_2d(np.asarray(func(mid), dtype=float))
+    linear=(y[:, :-1]+y[:, 1:])/2
+    scale=np.maximum(np.abs(ym), np.finfo(float).tiny)
+    return mid, np.max(np.abs(ym-linear)/scale, axis=0)
+
+
+def interpolation_error(func, p):
+    """Largest relative error of linear interpolation on grid ``p`` (checked at midpoints)."""
+    p=np.asarray(p, dtype=float)
+    if len(p)<2:
+        return 0.0
+    return float(_midpoint_error(func, p)[1].max())
+
+
+def adaptive_grid(func, pmin, pmax, pb, tol=1e-3, max_points=1000, min_step=1.0):
+    """Grid on [pmin, pmax] that always contains ``pb`` and resolves ``func`` to ``tol``.
+
+    ``func`` maps a pressure array to one curve, or to a stack of curves of
+    shape (k, n) that must all meet the tolerance.  Refinement stops when
+    every interval is within ``tol``, is narrower than ``2*min_step``, or the
+    grid reaches ``max_points`` (worst intervals are split first).
+    """
+    p=_seed(float(pmin), float(pmax), float(pb), float(min_step))
+    while len(p)<max_points:
+        mid, err=_midpoint_error(func, p)
+        split=(err>tol)&(np.diff(p)>=2*min_step)
+        if not split.any():
+            break
+        room=max_points-len(p)
+        if split.sum()>room:
+            ## keep only the worst intervals that still fit under the cap
+            worst=np.argsort(np.where(split, err, -np.inf))[::-1][:room]
+            split=np.zeros_like(split)
+            split[worst]=True
+        p=np.union1d(p, mid[split])
+    return p
@@ -0,0 +1,305 @@
+"""Typed, chunked reading and writing of PVT data files.
+
+The pages only ever use two columns of an uploaded file, so the readers here
+declare the wanted columns and their dtype up front, drop every other column
+while parsing, and stream large CSV files in blocks.  When pyarrow is
+installed its multithreaded CSV reader is used; otherwise pandas' C parser
+reads the file in row chunks.  Each column is assembled into one float array
+at the end, so peak memory stays close to the size of the result.
+
+Parquet and Arrow (Feather v2) files are columnar and already typed, so they
+are read column by column without any text parsing, and results can be
+written back to either format for downstream tools.
+"""
+
+import csv
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa=pa_csv=feather=pq=None
+
+## the columns the FVF and viscosity pages read from an upload, in order
+PRESSURE_RS_COLUMNS=("Pressure(psia)", "Rs(scf/STB)")
+
+## position of each standard column in a file that names its columns differently
+LAYOUT={column: i for i, column in enumerate(PRESSURE_RS_COLUMNS)}
+
+BLOCK_SIZE=1<<22
+CHUNKSIZE=250_000
+
+FORMATS=("csv", "excel", "parquet", "arrow")
+SUFFIXES={".csv": "csv", ".xlsx": "excel", ".xls": "excel", ".parquet": "parquet", ".pq": "parquet",
+          ".arrow": "arrow", ".feather": "arrow"}
+MIME_TYPES={"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+            "arrow": "application/vnd.apache.arrow.file"}
+
+
+def file_format(path, default="csv"):
+    """The format of ``path`` judged by its suffix, ``default`` when unknown."""
+    return SUFFIXES.get(os.path.splitext(str(path))[1].lower(), default)
+
+
+def _format(ext):
+    fmt=ext.lower()
+    fmt={"xlsx": "excel", "xls": "excel", "pq": "parquet", "feather": "arrow"}.get(fmt, fmt)
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown file format '{ext}' (choose from {', '.join(FORMATS)})")
+    if fmt in ("parquet", "arrow") and pa is None:
+        raise ValueError(f"reading and writing {fmt} files needs pyarrow")
+    return fmt
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _header(source):
+    ## the column names on the first line, leaving file-like sources where they were
+    if hasattr(source, "readline"):
+        pos=source.tell()
+        line=source.readline()
+        source.seek(pos)
+    else:
+        with open(source, "rb") as f:
+            line=f.readline()
+    if isinstance(line, bytes):
+        line=line.decode("utf-8-sig")
+    return next(csv.reader([line]), [])
+
+
+def _resolve(header, columns):
+    ## match wanted columns by name, falling back to their position in the file: the standard
+    ## layout's for its columns (Rs is the second column even when only Rs is wanted), else the request's
+    names=[]
+    for i, column in enumerate(columns):
+        pos=LAYOUT.get(column, i)
+        if column in header:
+            names.append(column)
+        elif pos<len(header) and header[pos] not in columns and header[pos] not in LAYOUT:
+            names.append(header[pos])
+        else:
+            raise ValueError(f"file has no column '{column}' nor an unnamed one in position {pos+1} "
+                             f"(found: {', '.join(header)})")
+    return names
+
+
+def _assemble(chunks, columns, dtype=np.float64):
+    ## one (rows x columns) array filled column by column, releasing each column's chunks as it goes
+    rows=sum(len(c) for c in chunks[0]) if chunks else 0
+    out=np.empty((rows, len(columns)), dtype=dtype)
+    for j in range(len(columns)):
+        pos=0
+        for i, part in enumerate(chunks[j]):
+            out[pos:pos+len(part), j]=part
+            pos+=len(part)
+            chunks[j][i]=None
+    return pd.DataFrame(out, columns=list(columns), copy=False)
+
+
+def _read_csv_arrow(source, names, columns, dtype):
+    reader=pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(include_columns=names,
+                                              column_types={n: str(np.dtype(dtype)) for n in names}),
+    )
+    chunks=[[] for _ in names]
+    for batch in reader:
+        for j, name in enumerate(names):
+            chunks[j].append(batch.column(name).to_numpy(zero_copy_only=False))
+    return _assemble(chunks, columns, dtype)
+
+
+def _read_csv_pandas(source, names, columns, dtype):
+    chunks=[[] for _ in names]
+    for chunk in pd.read_csv(source, usecols=names, dtype={n: dtype for n in names},
+                             chunksize=CHUNKSIZE, engine="c"):
+        for j, name in enumerate(names):
+            chunks[j].append(chunk[name].to_numpy())
+    return _assemble(chunks, columns, dtype)
+
+
+def _read_columnar(source, fmt, columns, dtype):
+    ## parquet/arrow store typed columns, so only the wanted ones are read and cast
+    if fmt=="parquet":
+        header=pq.ParquetFile(source).schema_arrow.names
+        _rewind(source)
+        names=_resolve(header, columns)
+        table=pq.read_table(source, columns=names)
+    else:
+        table=feather.read_table(source)
+        names=_resolve(table.column_names, columns)
+    chunks=[[c.to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+             for c in table.column(name).chunks] for name in names]
+    return _assemble(chunks, columns, dtype)
+
+
+def read_columns(source, columns=PRESSURE_RS_COLUMNS, ext="csv", engine=None, dtype=np.float64):
+    """Read ``columns`` of a CSV, Excel, Parquet or Arrow file as floats, renamed to ``columns``.
+
+    ``source`` is a path or a file-like object such as a Streamlit upload.
+    A wanted column missing by name is taken from its position in the
+    standard layout (pressure first, Rs second), so headers like ``P,Rs``
+    still load, even when only Rs is wanted.  ``engine`` forces ``"pyarrow"``
+    or ``"pandas"`` for CSV; by default pyarrow is used when installed.
+    ``dtype`` may be float32 to parse straight into single precision.
+    """
+    columns=tuple(columns)
+    fmt=_format(ext)
+    _rewind(source)
+    if fmt in ("parquet", "arrow"):
+        return _read_columnar(source, fmt, columns, dtype)
+    if fmt=="excel":
+        header=[str(c) for c in pd.read_excel(source, nrows=0).columns]
+        names=_resolve(header, columns)
+        _rewind(source)
+        df=pd.read_excel(source, usecols=names, dtype={n: dtype for n in names})
+        return df[names].set_axis(list(columns), axis=1)
+
+    names=_resolve(_header(source), columns)
+    engine=engine or ("pyarrow" if pa_csv is not None else "pandas")
+    if engine=="pyarrow":
+        if isinstance(source, io.TextIOBase):
+            source=io.BytesIO(source.read().encode())
+        return _read_csv_arrow(source, names, columns, dtype)
+    return _read_csv_pandas(source, names, columns, dtype)
+
+
+def _floats_as(df, dtype):
+    ## float columns cast to dtype; ids and other columns are left alone
+    if dtype is None:
+        return df
+    return df.astype({c: dtype for c in df.select_dtypes("floating").columns}, copy=False)
+
+
+def read_table(source, ext="csv", dtype=None):
+    """A whole table (e.g. the batch well table) from a CSV, Excel, Parquet or Arrow file.
+
+    ``dtype`` (e.g. float32) is applied to the float columns.
+    """
+    fmt=_format(ext)
+    _rewind(source)
+    if fmt=="parquet":
+        return _floats_as(pq.read_table(source).to_pandas(), dtype)
+    if fmt=="arrow":
+        return _floats_as(feather.read_table(source).to_pandas(), dtype)
+    if fmt=="excel":
+        return _floats_as(pd.read_excel(source), dtype)
+    return _floats_as(pd.read_csv(source), dtype)
+
+
+def _arrow_batches(path, fmt, chunksize):
+    if fmt=="parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+    else:
+        ## memory-mapped, so only the batch being converted is paged in
+        with pa.memory_map(str(path)) as src:
+            yield from pa.ipc.open_file(src).read_all().to_batches(max_chunksize=chunksize)
+
+
+def _numbered(batches, dtype):
+    ## RecordBatch.to_pandas() restarts the index at 0; continue it like read_csv(chunksize=) does
+    offset=0
+    for batch in batches:
+        df=batch.to_pandas()
+        df.index=pd.RangeIndex(offset, offset+len(df))
+        offset+=len(df)
+        yield _floats_as(df, dtype)
+
+
+def iter_table(path, chunksize, ext=None, dtype=None):
+    """DataFrames of at most ``chunksize`` rows streamed from a CSV, Parquet or Arrow file.
+
+    ``dtype`` (e.g. float32) is applied to the float columns of each chunk.
+    Every chunk is indexed by its row numbers in the file, whatever the
+    format, so the index can serve as a well id.
+    """
+    fmt=_format(ext or file_format(path))
+    if fmt in ("parquet", "arrow"):
+        yield from _numbered(_arrow_batches(path, fmt, chunksize), dtype)
+    elif fmt=="csv":
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield _floats_as(chunk, dtype)
+    else:
+        raise ValueError("Excel input cannot be streamed; convert it to CSV or Parquet")
+
+
+def to_bytes(df, ext="csv"):
+    """``df`` serialised as CSV, Parquet or Arrow, e.g. for a download button.
+
+    Parquet and Arrow keep the float columns as binary in their own dtype
+    (float64 or float32), with no text round-trip.
+    """
+    fmt=_format(ext)
+    if fmt=="csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buf=io.BytesIO()
+    table=pa.Table.from_pandas(df, preserve_index=False)
+    if fmt=="parquet":
+        pq.write_table(table, buf)
+    elif fmt=="arrow":
+        feather.write_feather(table, buf)
+    else:
+        raise ValueError("Excel output is not supported; use CSV, Parquet or Arrow")
+    return buf.getvalue()
+
+
+class FrameWriter:
+    """Append DataFrame chunks to one CSV, Parquet or Arrow file.
+
+    The first chunk fixes the columns (and for Parquet/Arrow the schema);
+    ``path`` may be ``"-"`` for CSV on stdout.  Use as a context manager.
+    """
+
+    def __init__(self, path, ext=None):
+        self.path=path
+        self.format=_format(ext or file_format(path))
+        if self.format=="excel":
+            raise ValueError("Excel output is not supported; use CSV, Parquet or Arrow")
+        if path=="-" and self.format!="csv":
+            raise ValueError(f"{self.format} output cannot go to stdout")
+        self._out=None
+        self._writer=None
+        self._schema=None
+        if self.format=="csv":
+            self._out=sys.stdout if path=="-" else open(path, "w", newline="")
+
+    def write(self, df):
+        if self.format=="csv":
+            df.to_csv(self._out, header=self._schema is None, index=False)
+            self._schema=list(df.columns)
+            return
+        table=pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema=table.schema
+            if self.format=="parquet":
+                self._writer=pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._out=pa.OSFile(str(self.path), "wb")
+                self._writer=pa.ipc.new_file(self._out, self._schema)
+        else:
+            table=table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._out is not None and self._out is not sys.stdout:
+            self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,268 @@
+"""Optional Numba-compiled twins of the Rs, Bo and live-oil viscosity correlations.
+
+The NumPy correlations evaluate a formula as a chain of whole-array
+operations, each allocating a full-size (wells x pressures) temporary.  The
+twins here compute the terms that depend only on the fluid with NumPy, at
+the fluid's own (one value per well) shape, and hand the per-pressure part
+to a kernel compiled with ``numba.vectorize``: a single fused loop that
+writes the result directly, allocates no temporaries, broadcasts like the
+NumPy version and, for large arrays, runs on every core
+(``target="parallel"``).
+
+Numba is optional.  :func:`compiled` maps a NumPy correlation to its
+compiled twin and returns the NumPy function unchanged when Numba is not
+installed or the function has no twin, so callers never need to check.
+Kernels are compiled on first use and cached on disk.  :func:`verify`
+checks every twin against its NumPy original.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is optional
+    numba=None
+
+from pvt import fvf, solubility, viscosity
+from pvt.common import Yo, Ygs, Rankine, standing_10x, petrosky_10x, switch
+
+AVAILABLE=numba is not None
+
+## arrays smaller than this run on the single-threaded kernel, where thread start-up would dominate
+PARALLEL_MIN_SIZE=1<<15
+
+_PF_BO=7.2046*10**(-5)
+_CC=(8.62*10**(-5), 1.1*10**(-3), 3.74*10**(-3), 2.2*10**(-7), 7.4*10**(-4))
+
+
+## scalar kernels -----------------------------------------------------------------
+## arguments after p/pb or rs are the fluid terms hoisted out by the wrappers below;
+## p is clamped at pb like np.minimum, NaN included, and pb=inf means no clamping
+
+def _rs_standing(p, pb, yg, ten_x):
+    if pb<p or pb!=pb:
+        p=pb
+    return yg*(((p/18.2+1.4)*ten_x)**1.2048)
+
+
+def _rs_beggs(p, pb, c1_ygs, c2, e):
+    if pb<p or pb!=pb:
+        p=pb
+    return c1_ygs*(p**c2)*e
+
+
+def _rs_marhoun(p, pb, k):
+    if pb<p or pb!=pb:
+        p=pb
+    return (k*p)**1.398441
+
+
+def _rs_petrosky(p, pb, g, ten_x):
+    if pb<p or pb!=pb:
+        p=pb
+    return ((p/112.727+12.340)*g*ten_x)**1.73184
+
+
+def _bo_standing(rs, g, t, c0, c1, c4):
+    return c0+c1*(rs*g+t)**c4
+
+
+def _bo_vasquez_beggs(rs, c1, f, c2, c3):
+    return 1.0+c1*rs+f*(c2+c3*rs)
+
+
+def _bo_glaso(rs, g, t):
+    b=math.log10(rs*g+t)
+    return 1+10**(-6.58511+2.91329*b-0.27683*b**2)
+
+
+def _bo_marhoun(rs, a, w, d, d2, d3):
+    F=rs**a*w
+    return d+d2*F+d3*F*F
+
+
+def _bo_petrosky(rs, g, t):
+    return 1.0113+_PF_BO*(rs**0.3738*g+t)**3.0936
+
+
+def _uob_chew_connally(rs, uod):
+    b=0.68/10**(_CC[0]*rs)+0.25/10**(_CC[1]*rs)+0.062/10**(_CC[2]*rs)
+    return 10**(rs*(_CC[3]*rs-_CC[4]))*uod**b
+
+
+def _uob_beggs_robinson(rs, uod):
+    return 10.715*(rs+100)**(-0.515)*uod**(5.44*(rs+150)**(-0.338))
+
+
+_KERNELS={}
+
+
+def _kernel(pyfunc, size):
+    ## compiled ufunc for pyfunc, single-threaded for small arrays and parallel for large ones
+    target="parallel" if size>=PARALLEL_MIN_SIZE else "cpu"
+    key=(pyfunc.__name__, target)
+    if key not in _KERNELS:
+        nargs=pyfunc.__code__.co_argcount
+        ## float32 inputs get a float32 loop, so single-precision batches stay single precision;
+        ## it goes first because NumPy takes the first loop the inputs cast to safely
+        signatures=[numba.float32(*[numba.float32]*nargs), numba.float64(*[numba.float64]*nargs)]
+        _KERNELS[key]=numba.vectorize(signatures, target=target, cache=True)(pyfunc)
+    return _KERNELS[key]
+
+
+def _apply(pyfunc, *args):
+    ## one common float dtype; scalars follow the arrays, so float32 inputs pick the float32 loop
+    args=[np.asarray(a) for a in args]
+    dtype=np.result_type(*args, 1.0)
+    args=[a.astype(dtype, copy=False) for a in args]
+    size=np.broadcast(*args).size
+    return _kernel(pyfunc, size)(*args)
+
+
+def _pb(pb):
+    return np.inf if pb is None else pb
+
+
+## compiled twins with the same signatures as the NumPy correlations -----------------
+## terms that depend on the fluid only are computed by NumPy at the fluid's (usually
+## one value per well) shape; the kernel does the per-pressure work in one pass
+
+def Rs_standing(p, api, yg, T, pb=None):
+    return _apply(_rs_standing, p, _pb(pb), yg, standing_10x(api, T))
+
+
+def Rs_beggs(p, api, yg, T, psep, tsep, pb=None):
+    c1, c2, c3 = solubility._beggs_coefficients(api)
+    return _apply(_rs_beggs, p, _pb(pb), c1*Ygs(yg, api, psep, tsep), c2, np.exp(c3*(api/Rankine(T))))
+
+
+def Rs_Marhouns(p, api, yg, T, pb=None):
+    k=185.843208*yg**1.877840*Yo(api)**-3.1437*Rankine(T)**-1.3265
+    return _apply(_rs_marhoun, p, _pb(pb), k)
+
+
+def Rs_Petrosky_farshad(p, api, yg, T, pb=None):
+    return _apply(_rs_petrosky, p, _pb(pb), yg**0.8439, petrosky_10x(api, T))
+
+
+def Bo_Standing(rs, api, yg, T, coef=fvf.STANDING_BO):
+    c0, c1, c2, c3, c4 = coef
+    return _apply(_bo_standing, rs, (yg/Yo(api))**c2, c3*T, c0, c1, c4)
+
+
+def Bo_Vasquez_Beggs(rs, api, yg, T, psep, tsep):
+    low=api<=30
+    c1=switch(low, 4.677*10**(-4), 4.670*10**(-4), api)
+    c2=switch(low, 1.751*10**(-5), 1.100*10**(-5), api)
+    c3=switch(low, -1.811*10**(-8), 1.337*10**(-9), api)
+    return _apply(_bo_vasquez_beggs, rs, c1, (T-60)*(api/Ygs(yg, api, psep, tsep)), c2, c3)
+
+
+def Bo_Glaso(rs, api, yg, T):
+    return _apply(_bo_glaso, rs, (yg/Yo(api))**0.526, 0.968*T)
+
+
+def Bo_Marhoun(rs, api, yg, T, coef=fvf.MARHOUN_BO):
+    a, b, c, d0, d1, d2, d3 = coef
+    return _apply(_bo_marhoun, rs, a, yg**b*Yo(api)**c, d0+d1*Rankine(T), d2, d3)
+
+
+def Bo_Petrosky_Farshad(rs, api, yg, T):
+    return _apply(_bo_petrosky, rs, yg**0.2914/Yo(api)**0.6265, 0.24626*T**0.5371)
+
+
+def uob_Chew_Connally(rs, uod):
+    return _apply(_uob_chew_connally, rs, uod)
+
+
+def uob_Beggs_Robinson(rs, uod):
+    return _apply(_uob_beggs_robinson, rs, uod)
+
+
+## NumPy correlation -> compiled twin; the dead-oil viscosities depend on the fluid
+## alone and are already one value per well, so they stay in NumPy
+TWINS={
+    solubility.Rs_standing: Rs_standing,
+    solubility.Rs_beggs: Rs_beggs,
+    solubility.Rs_Marhouns: Rs_Marhouns,
+    solubility.Rs_Petrosky_farshad: Rs_Petrosky_farshad,
+    fvf.Bo_Standing: Bo_Standing,
+    fvf.Bo_Vasquez_Beggs: Bo_Vasquez_Beggs,
+    fvf.Bo_Glaso: Bo_Glaso,
+    fvf.Bo_Marhoun: Bo_Marhoun,
+    fvf.Bo_Petrosky_Farshad: Bo_Petrosky_Farshad,
+    viscosity.uob_Chew_Connally: uob_Chew_Connally,
+    viscosity.uob_Beggs_Robinson: uob_Beggs_Robinson,
+}
+for _numpy, _twin in TWINS.items():
+    _twin.__doc__=f"Compiled twin of :func:`{_numpy.__module__}.{_numpy.__name__}`."
+
+
+def compiled(func):
+    """The compiled twin of a NumPy correlation, or ``func`` itself without Numba."""
+    if not AVAILABLE:
+        return func
+    return TWINS.get(func, func)
+
+
+def _sample_inputs(n, rng, missing=False):
+    ## realistic, partly saturated inputs covering both Vasquez-Beggs API branches;
+    ## missing=True makes row k NaN in the k-th input only, so every engine sees each kind of missing value
+    inputs={
+        "p": rng.uniform(15, 6000, n), "pb": rng.uniform(500, 5000, n), "rs": rng.uniform(1, 1500, n),
+        "api": rng.uniform(15, 55, n), "yg": rng.uniform(0.55, 1.3, n), "T": rng.uniform(80, 320, n),
+        "psep": rng.uniform(50, 300, n), "tsep": rng.uniform(40, 120, n), "uod": rng.uniform(0.3, 30, n),
+    }
+    if missing:
+        for row, values in enumerate(inputs.values()):
+            values[row]=np.nan
+    return inputs
+
+
+## largest relative difference verify() accepts from the float64 NumPy result, per input precision
+RTOL={"float64": 1e-12, "float32": 1e-5}
+
+
+def verify(n=100_000, rtol=None, seed=0, twins=None, dtype="float64", missing=False):
+    """Largest relative difference of every twin from its NumPy original.
+
+    ``twins`` maps NumPy correlations to replacements and defaults to the
+    compiled kernels.  With ``dtype="float32"`` the twins get float32 inputs
+    and must return float32; they are compared with NumPy in float64 on the
+    same (rounded) inputs.  ``missing=True`` adds a NaN row per input; the
+    results must be NaN exactly where NumPy's are.  Raises AssertionError if
+    any difference exceeds ``rtol`` (default :data:`RTOL` for ``dtype``,
+    inf for a different NaN pattern) or a result has the wrong dtype;
+    returns {name: difference}.
+    """
+    import inspect
+
+    dtype=np.dtype(dtype)
+    rtol=RTOL[dtype.name] if rtol is None else rtol
+    if twins is None:
+        twins={func: compiled(func) for func in TWINS}
+    inputs={name: values.astype(dtype) for name, values in _sample_inputs(n, np.random.default_rng(seed), missing).items()}
+    report={}
+    wrong_dtype={}
+    for numpy_func, twin in twins.items():
+        params=list(inspect.signature(numpy_func).parameters)
+        args={name: inputs[name] for name in params if name in inputs}
+        with np.errstate(invalid="ignore"):
+            ref=np.asarray(numpy_func(**{name: value.astype(float) for name, value in args.items()}), dtype=float)
+            got=np.asarray(twin(**args))
+        if got.dtype!=dtype:
+            wrong_dtype[numpy_func.__name__]=str(got.dtype)
+        got=got.astype(float)
+        same_nan=np.array_equal(np.isnan(ref), np.isnan(got))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel=np.abs(got-ref)/np.abs(ref)
+        worst=float(np.nanmax(np.where(ref==got, 0.0, rel))) if same_nan else np.inf
+        report[numpy_func.__name__]=worst
+    if wrong_dtype:
+        raise AssertionError(f"{dtype} inputs gave results of another dtype: {wrong_dtype}")
+    bad={name: err for name, err in report.items() if not err<=rtol}
+    if bad:
+        raise AssertionError(f"kernels differ from NumPy beyond rtol={rtol} in {dtype}: {bad}")
+    return report
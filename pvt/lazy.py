@@ -0,0 +1,59 @@
+"""Deferred imports for the heavy dependencies.
+
+``px=lazy_import("plotly.express")`` binds a module whose body runs on the
+first attribute access, so a page or module can name a heavy dependency at
+the top like any other import while paying for it only on the code path
+that uses it.  A module that is already imported is returned as is.
+
+:func:`lazy_exports` does the same for a package's re-exports: the package
+names them in ``__all__`` but imports the defining module (and whatever it
+pulls in, such as pandas) only when one of them is first used.
+
+A missing module raises ImportError straight away, as a normal import
+would, so optional dependencies keep the usual pattern::
+
+    try:
+        numexpr=lazy_import("numexpr")
+    except ImportError:
+        numexpr=None
+"""
+
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """The module ``name``, executed on first attribute access (its parent packages are imported now)."""
+    module=sys.modules.get(name)
+    if module is not None:
+        return module
+    spec=importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader=importlib.util.LazyLoader(spec.loader)
+    spec.loader=loader
+    module=importlib.util.module_from_spec(spec)
+    sys.modules[name]=module
+    loader.exec_module(module)
+    return module
+
+
+def lazy_exports(package, exports):
+    """Module ``__getattr__`` and ``__dir__`` for ``package`` that import each name of ``exports``
+    (name -> defining module) on first use.
+    """
+
+    def __getattr__(name):
+        module=exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value=getattr(importlib.import_module(module), name)
+        ## later lookups find it directly
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package]))|set(exports))
+
+    return __getattr__, __dir__
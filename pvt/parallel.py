@@ -0,0 +1,116 @@
+"""Process-pool execution of large well batches.
+
+The well table is split into row chunks that are computed by worker
+processes with :func:`pvt.batch.batch_arrays`.  Each worker writes its rows
+straight into shared-memory result arrays allocated by the parent, so only
+the (small) well inputs are pickled and the big (wells x pressures) arrays
+never travel back through a pipe.
+
+A caller computing many batches (the CLI's chunked batch command) keeps one
+:class:`BatchPool` open, so the worker processes and the shared blocks are
+created once and reused by every batch.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pvt.batch import PROPERTIES, batch_arrays, check_dtype, to_long
+
+
+def _fill_chunk(names, shape, start, wells, p, props, correlations):
+    ## worker side: attach to the parent's blocks and write rows start:start+len(wells)
+    blocks=[shared_memory.SharedMemory(name=name) for name in names]
+    dtype=check_dtype(correlations.get("dtype", "float64"))
+    try:
+        arrays=batch_arrays(wells, p, props, **correlations)
+        for block, prop in zip(blocks, props):
+            out=np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            out[start:start+len(wells)]=arrays[prop]
+            del out
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def chunk_bounds(n, workers, chunk_size=None):
+    """Row ranges covering n wells; by default about four chunks per worker."""
+    if chunk_size is None:
+        chunk_size=max(1, -(-n//(workers*4)))
+    return [(start, min(start+chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+class BatchPool:
+    """Worker processes and shared result blocks reused across :func:`parallel_batch_arrays` calls.
+
+    Blocks grow to the largest batch seen; use as a context manager, or call
+    :meth:`close`, to stop the workers and release the blocks.
+    """
+
+    def __init__(self, workers=None):
+        self.workers=workers or os.cpu_count() or 1
+        self.executor=ProcessPoolExecutor(max_workers=self.workers)
+        self._blocks=[]
+
+    def blocks(self, count, nbytes):
+        """``count`` shared blocks of at least ``nbytes`` bytes each."""
+        if len(self._blocks)<count or any(b.size<nbytes for b in self._blocks[:count]):
+            self._release()
+            self._blocks=[shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(count)]
+        return self._blocks[:count]
+
+    def _release(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks=[]
+
+    def close(self):
+        self.executor.shutdown()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parallel_batch_arrays(wells, p, props=PROPERTIES, workers=None, chunk_size=None, pool=None, **correlations):
+    """Same result as :func:`pvt.batch.batch_arrays`, computed by a process pool.
+
+    ``workers`` defaults to the CPU count and ``chunk_size`` (wells per task)
+    to about four tasks per worker.  With one worker the batch runs in-process.
+    ``pool`` is an open :class:`BatchPool` to run on instead of starting one
+    for this call; its worker count then applies.
+    """
+    workers=pool.workers if pool is not None else workers or os.cpu_count() or 1
+    props=tuple(props)
+    p=np.asarray(p, dtype=float)
+    if workers==1 or len(wells)<=1:
+        return batch_arrays(wells, p, props, **correlations)
+    if pool is None:
+        with BatchPool(workers) as pool:
+            return parallel_batch_arrays(wells, p, props, chunk_size=chunk_size, pool=pool, **correlations)
+
+    shape=(len(wells), len(p))
+    dtype=check_dtype(correlations.get("dtype", "float64"))
+    blocks=pool.blocks(len(props), max(1, shape[0]*shape[1]*dtype.itemsize))
+    futures=[
+        pool.executor.submit(_fill_chunk, [b.name for b in blocks], shape, start,
+                             wells.iloc[start:stop], p, props, correlations)
+        for start, stop in chunk_bounds(len(wells), workers, chunk_size)
+    ]
+    for future in futures:
+        future.result()
+    ## one copy out of shared memory so the blocks can be reused
+    return {prop: np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+            for block, prop in zip(blocks, props)}
+
+
+def run_batch_parallel(wells, p, props=PROPERTIES, workers=None, chunk_size=None, **correlations):
+    """Parallel counterpart of :func:`pvt.batch.run_batch`."""
+    arrays=parallel_batch_arrays(wells, p, props, workers, chunk_size, **correlations)
+    return to_long(wells, p, arrays)
@@ -0,0 +1,42 @@
+"""Plotly figures for the pages, rendered with WebGL and downsampled for display.
+
+Only the figure is reduced; callers keep the full-resolution arrays for
+tables and downloads.  Plotly is imported here rather than in ``pvt`` so
+the correlations stay importable without it.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from pvt.downsample import downsample
+
+## above this many points a trace is reduced with LTTB before it is sent to the browser
+MAX_POINTS=2000
+
+
+def _axis(title):
+    return dict(title=title, mirror=True, ticks='outside', showline=True,
+                linecolor='white', gridcolor='lightgrey')
+
+
+def _trace(x, y, max_points, name=None):
+    x, y = downsample(np.ravel(np.asarray(x, dtype=float)), np.ravel(np.asarray(y, dtype=float)), max_points)
+    return go.Scattergl(x=x, y=y, mode='lines', name=name)
+
+
+def line_figure(x, y, x_title, y_title, title=None, max_points=MAX_POINTS):
+    """Line chart in the pages' house style using a WebGL (``Scattergl``) trace."""
+    fig=go.Figure(_trace(x, y, max_points))
+    fig.update_layout(plot_bgcolor='white', title_text=title)
+    fig.update_xaxes(**_axis(x_title))
+    fig.update_yaxes(**_axis(y_title))
+    return fig
+
+
+def lines_figure(x, curves, x_title, y_title, title=None, max_points=MAX_POINTS):
+    """Several named curves over the same x overlaid on one chart (``curves``: name -> y)."""
+    fig=go.Figure([_trace(x, y, max_points, name) for name, y in curves.items()])
+    fig.update_layout(plot_bgcolor='white', title_text=title, legend_title_text='Correlation')
+    fig.update_xaxes(**_axis(x_title))
+    fig.update_yaxes(**_axis(y_title))
+    return fig
@@ -0,0 +1,142 @@
+"""Stage timings for page reruns.
+
+A :class:`Profiler` times named stages of a rerun: ``ingestion`` (reading
+inputs and uploads), ``compute`` (the correlations), ``table`` (building and
+writing DataFrames) and ``plot`` (building and writing figures).  Wrap a
+stage in ``with profiler.stage("compute"):`` or decorate a page helper with
+``@profiler.timed("plot")``; a stage entered more than once in a rerun adds
+up, and whatever falls outside every stage is reported as ``other``.  The
+last :data:`HISTORY` reruns are kept, so a slow rerun can be compared with
+the ones before it and exported as JSON.
+
+Timing is opt-in: while ``enabled`` is false, :meth:`Profiler.stage` does
+nothing.  :func:`session_profiler` and :func:`sidebar_panel` connect a
+profiler to a Streamlit session and a sidebar checkbox; they import
+Streamlit when called, so the timer itself stays headless.
+"""
+
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+STAGES=("ingestion", "compute", "table", "plot")
+## reruns kept per session
+HISTORY=50
+## rerun time, in ms, above which the sidebar panel flags the slowest stage
+BUDGET_MS=500
+## session-state key of the sidebar checkbox that turns profiling on
+ENABLED_KEY="profile_stages"
+
+
+class Profiler:
+    """Stage timings of the current rerun plus a rolling history of earlier ones."""
+
+    def __init__(self, history=HISTORY, enabled=False):
+        self.enabled=enabled
+        self.history=deque(maxlen=history)
+        self.current=None
+        self._start=None
+
+    def start(self, page):
+        """Begin timing a rerun of ``page``; the record joins the history straight away."""
+        ## a rerun cut short (an exception, or st.stop() without the panel) keeps what it measured
+        self.finish()
+        if not self.enabled:
+            return
+        self._start=time.perf_counter()
+        self.current={"page": page, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "total": 0.0,
+                      "stages": dict.fromkeys(STAGES, 0.0)}
+        self.history.append(self.current)
+
+    @contextmanager
+    def stage(self, name):
+        """Add the time spent inside the ``with`` block to stage ``name`` of the current rerun."""
+        if self.current is None:
+            yield
+            return
+        start=time.perf_counter()
+        try:
+            yield
+        finally:
+            stages=self.current["stages"]
+            stages[name]=stages.get(name, 0.0)+time.perf_counter()-start
+
+    def timed(self, name):
+        """Decorator: every call of the function is timed as stage ``name``."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def finish(self):
+        """Close the current rerun and return its record (None when profiling is off)."""
+        record=self.current
+        if record is not None:
+            record["total"]=time.perf_counter()-self._start
+            record["stages"]["other"]=max(0.0, record["total"]-sum(
+                seconds for name, seconds in record["stages"].items() if name!="other"))
+            self.current=None
+        return record
+
+    def to_frame(self):
+        """One row per rerun, newest first: page, time, total and every stage, in ms."""
+        rows=[{"Page": r["page"], "Time": r["time"], "Total": r["total"]*1e3,
+               **{name: seconds*1e3 for name, seconds in r["stages"].items()}} for r in reversed(self.history)]
+        return pd.DataFrame(rows)
+
+    def to_json(self):
+        """The history, oldest first, as a JSON document (seconds)."""
+        return json.dumps({"stages": list(STAGES)+["other"], "reruns": list(self.history)}, indent=2)
+
+
+def session_profiler(page, key="profiler"):
+    """The session's profiler, started on ``page`` if the sidebar checkbox is ticked.
+
+    It draws nothing, so pages call it straight after their imports, before
+    ``st.set_page_config`` and the helpers decorated with :meth:`Profiler.timed`.
+    """
+    import streamlit as st
+
+    profiler=st.session_state.get(key)
+    if profiler is None:
+        profiler=st.session_state[key]=Profiler()
+    profiler.enabled=bool(st.session_state.get(ENABLED_KEY, False))
+    profiler.start(page)
+    return profiler
+
+
+def sidebar_panel(profiler, budget_ms=BUDGET_MS):
+    """The opt-in checkbox and, when ticked, this rerun's stage timings, the history and a JSON download.
+
+    Call it at the end of the page and before any ``st.stop()``.
+    """
+    import streamlit as st
+
+    record=profiler.finish()
+    with st.sidebar:
+        st.checkbox('Profile stage timings', key=ENABLED_KEY,
+                    help='Time the ingestion, compute, table and plot stages of every rerun.')
+        if record is None:
+            return
+        st.subheader('Stage timings')
+        stages=pd.DataFrame({'Stage': list(record['stages']),
+                             'ms': [seconds*1e3 for seconds in record['stages'].values()]})
+        st.dataframe(stages, hide_index=True)
+        total=record['total']*1e3
+        slowest=max(record['stages'], key=record['stages'].get)
+        if total>budget_ms:
+            st.warning(f'Rerun took {total:.0f} ms, over the {budget_ms} ms budget; '
+                       f'slowest stage: {slowest} ({record["stages"][slowest]*1e3:.0f} ms)')
+        else:
+            st.caption(f'Rerun took {total:.0f} ms; slowest stage: {slowest}')
+        with st.expander(f'Last {len(profiler.history)} reruns'):
+            st.dataframe(profiler.to_frame().round(1), hide_index=True)
+        st.download_button('Download timings as JSON', profiler.to_json(), file_name='stage_timings.json',
+                           mime='application/json')
@@ -0,0 +1,293 @@
+"""HTTP/JSON service for the correlations: ``python -m pvt serve``.
+
+Programmatic clients get the page correlations without the Streamlit UI.
+The service uses only the standard library (``http.server``, one thread per
+connection, HTTP/1.1 keep-alive), and every request is a single NumPy call,
+so a request with thousands of pressures costs about the same as one with a
+single pressure.
+
+``GET /health``
+    ``{"status": "ok"}``.
+``GET /correlations``
+    Every correlation with its argument names and a one-line description.
+``POST /correlations/<name>``
+    ``{"inputs": {"p": [1000, 2000], "api": 47.1, ...}}`` returns
+    ``{"result": [...]}``.  Inputs may be numbers or (nested) lists and
+    broadcast like NumPy arrays, so one request can carry many pressures
+    and many fluids; ``null`` is not a valid input.  ``coef`` (Bo_Standing,
+    Bo_Marhoun) is one list of coefficients and is not broadcast.  The
+    ``*_compare`` correlations return one list per correlation.
+``POST /batch``
+    ``{"wells": [{"API": 47.1, "Yg": 0.851, "T": 250, "Psep": 150, "Tsep": 60,
+    "Rsb": 751}, ...], "pressures": [...]}`` returns every property as a
+    (wells x pressures) list of lists, computed by
+    :func:`pvt.batch.batch_arrays`.  Optional fields are ``props``,
+    ``correlations`` (e.g. ``{"bo": "Glaso"}``), ``engine`` and ``precision``.
+
+Values that are not numbers (outside a correlation's range) come back as
+``null``.  Errors are returned as ``{"error": message}`` with status 400
+(bad input), 404 (unknown path or correlation), 413 (body too large, or a
+result of more than ``max_cells`` values per array) or 500.  The cell limit
+defaults to ``PVT_MAX_CELLS`` (10 million) and ``serve --max-cells`` overrides
+it.
+"""
+
+import inspect
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson=None
+
+import pvt
+from pvt.batch import (
+    PROPERTIES,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+    batch_arrays,
+)
+
+## name -> function for every correlation on the pages
+CORRELATIONS={name: getattr(pvt, name) for name in pvt.__all__
+              if name.startswith(("Rs_", "Pb_", "Bo_", "Co_", "above_pb_", "uod_", "uob_", "uo_"))}
+
+## the batch request's "correlations" fields and their choices
+BATCH_CORRELATIONS={"rs": RS_CORRELATIONS, "pb": PB_CORRELATIONS, "bo": BO_CORRELATIONS, "co": CO_CORRELATIONS,
+                    "uod": UOD_CORRELATIONS, "uob": UOB_CORRELATIONS}
+
+## largest request body accepted, in bytes
+MAX_BODY=64<<20
+
+## largest result accepted: broadcast size of /correlations inputs, wells x pressures of /batch
+MAX_CELLS=int(os.environ.get("PVT_MAX_CELLS", "10000000"))
+
+
+class RequestError(ValueError):
+    """A request the service cannot answer; ``status`` is the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status=status
+
+
+def describe():
+    """{correlation: {"args": [...], "doc": first docstring line}}."""
+    return {name: {"args": list(inspect.signature(func).parameters),
+                   "doc": (func.__doc__ or "").strip().partition("\n")[0]}
+            for name, func in CORRELATIONS.items()}
+
+
+def _numeric(value):
+    ## results as contiguous arrays or plain scalars, which both encoders accept
+    if isinstance(value, dict):
+        return {str(k): _numeric(v) for k, v in value.items()}
+    value=np.asarray(value)
+    return value.item() if value.ndim==0 else np.ascontiguousarray(value)
+
+
+def jsonable(value):
+    """``value`` with arrays as lists, NumPy scalars as numbers and NaN/inf as None."""
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [jsonable(v) for v in value]
+    if isinstance(value, (str, int)) or value is None:
+        return value
+    value=np.asarray(value)
+    if value.dtype.kind=="f":
+        return np.where(np.isfinite(value), value, None).tolist()
+    return value.tolist()
+
+
+def dumps(payload):
+    """``payload`` as JSON bytes, NaN and inf as null.
+
+    orjson, when installed, writes NumPy arrays directly and formats floats
+    several times faster than ``json``; large batch responses are dominated
+    by float formatting.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable(payload), separators=(",", ":")).encode()
+
+
+def _array(name, value):
+    ## numbers or (nested) lists of numbers; null, strings, booleans and ragged lists are rejected, not read as NaN
+    try:
+        values=np.asarray(value)
+    except ValueError:
+        values=None
+    if values is None or values.dtype.kind not in "iuf":
+        raise RequestError(f"input '{name}' must be a number or a list of numbers")
+    return values.astype(float, copy=False)
+
+
+def _coef(name, value, default):
+    ## a correlation's coefficient tuple, passed as is rather than broadcast with the data
+    values=_array("coef", value)
+    if values.shape!=(len(default),):
+        raise RequestError(f"'coef' of {name} must be a list of {len(default)} numbers")
+    return tuple(values.tolist())
+
+
+def _check_cells(cells, max_cells, what):
+    if cells>max_cells:
+        raise RequestError(f"{what} has {cells} values, over the limit of {max_cells}", 413)
+
+
+def evaluate(name, inputs, max_cells=MAX_CELLS):
+    """``{"result": ...}`` of correlation ``name`` applied to ``inputs`` (argument name -> value)."""
+    func=CORRELATIONS.get(name)
+    if func is None:
+        raise RequestError(f"unknown correlation '{name}' (GET /correlations lists them)", 404)
+    if not isinstance(inputs, dict):
+        raise RequestError("'inputs' must be an object of argument name -> value")
+    params=inspect.signature(func).parameters
+    unknown=[k for k in inputs if k not in params]
+    if unknown:
+        raise RequestError(f"unknown input(s) {', '.join(unknown)} for {name} (choose from {', '.join(params)})")
+    missing=[k for k, param in params.items() if k not in inputs and param.default is param.empty]
+    if missing:
+        raise RequestError(f"missing input(s) {', '.join(missing)} for {name}")
+    arrays={k: _array(k, v) for k, v in inputs.items() if k!="coef"}
+    if "coef" in inputs:
+        arrays["coef"]=_coef(name, inputs["coef"], params["coef"].default)
+    try:
+        shape=np.broadcast_shapes(*(a.shape for k, a in arrays.items() if k!="coef"))
+    except ValueError as err:
+        raise RequestError(f"{name}: {err}") from None
+    _check_cells(int(np.prod(shape)), max_cells, f"the result of {name}")
+    try:
+        with np.errstate(all="ignore"):
+            result=func(**arrays)
+    except ValueError as err:
+        ## shapes that do not broadcast, coefficient tuples of the wrong length, ...
+        raise RequestError(f"{name}: {err}") from None
+    return {"result": _numeric(result)}
+
+
+def batch(body, max_cells=MAX_CELLS):
+    """Every requested property for every well at every pressure, as (wells x pressures) lists."""
+    wells=body.get("wells")
+    if not isinstance(wells, list) or not wells:
+        raise RequestError("'wells' must be a non-empty list of objects")
+    pressures=_array("pressures", body.get("pressures", []))
+    if pressures.ndim!=1 or not len(pressures):
+        raise RequestError("'pressures' must be a non-empty list of numbers")
+    _check_cells(len(wells)*len(pressures), max_cells, "the wells x pressures grid")
+    correlations=body.get("correlations", {})
+    if not isinstance(correlations, dict):
+        raise RequestError("'correlations' must be an object, e.g. {\"bo\": \"Glaso\"}")
+    for field, name in correlations.items():
+        if field not in BATCH_CORRELATIONS:
+            raise RequestError(f"unknown correlation field '{field}' (choose from {', '.join(BATCH_CORRELATIONS)})")
+        if name not in BATCH_CORRELATIONS[field]:
+            raise RequestError(f"unknown {field} correlation '{name}' "
+                               f"(choose from {', '.join(BATCH_CORRELATIONS[field])})")
+    props=tuple(body.get("props", PROPERTIES))
+    try:
+        table=pd.DataFrame(wells)
+        with np.errstate(all="ignore"):
+            arrays=batch_arrays(table, pressures, props, engine=body.get("engine", "numpy"),
+                                dtype=body.get("precision", "float64"), **correlations)
+    except (TypeError, ValueError) as err:
+        raise RequestError(str(err)) from None
+    ids=table["Well"].tolist() if "Well" in table.columns else list(range(len(table)))
+    return {"wells": ids, "pressures": pressures,
+            **{prop: _numeric(np.broadcast_to(values, (len(table), len(pressures)))) for prop, values in arrays.items()}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version="HTTP/1.1"
+    server_version="pvt"
+    ## headers and body go out as separate writes; with Nagle on, keep-alive clients wait ~40 ms for a delayed ACK
+    disable_nagle_algorithm=True
+    ## log every request to stderr; `serve --quiet` turns it off
+    quiet=False
+    max_cells=MAX_CELLS
+
+    def do_GET(self):
+        if self.path=="/health":
+            self._send(200, {"status": "ok"})
+        elif self.path=="/correlations":
+            self._send(200, describe())
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        try:
+            body=self._body()
+            if self.path.startswith("/correlations/"):
+                payload=evaluate(self.path[len("/correlations/"):], body.get("inputs", {}), self.max_cells)
+            elif self.path=="/batch":
+                payload=batch(body, self.max_cells)
+            else:
+                raise RequestError(f"unknown path {self.path}", 404)
+        except RequestError as err:
+            self._send(err.status, {"error": str(err)})
+        except Exception as err:
+            ## keep the connection answering; the error goes to the log
+            self.log_error("%s %s failed: %r", self.command, self.path, err)
+            self._send(500, {"error": f"{type(err).__name__}: {err}"})
+        else:
+            self._send(200, payload)
+
+    def _body(self):
+        length=int(self.headers.get("Content-Length") or 0)
+        if length>MAX_BODY:
+            ## the body is not read, so the connection cannot be reused
+            self.close_connection=True
+            raise RequestError(f"request body over {MAX_BODY>>20} MB", 413)
+        try:
+            body=json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as err:
+            raise RequestError(f"invalid JSON: {err}") from None
+        if not isinstance(body, dict):
+            raise RequestError("the request body must be a JSON object")
+        return body
+
+    def _send(self, status, payload):
+        data=dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads=True
+    ## connections waiting to be accepted; with the default of 5 a burst of new clients gets SYN retries (~1 s)
+    request_queue_size=128
+
+
+def make_server(host="127.0.0.1", port=8000, quiet=False, max_cells=MAX_CELLS):
+    """A threaded HTTP server for the service; ``port=0`` picks a free port."""
+    handler=type("Handler", (Handler,), {"quiet": quiet, "max_cells": max_cells})
+    return Server((host, port), handler)
+
+
+def serve(host="127.0.0.1", port=8000, quiet=False, max_cells=MAX_CELLS):
+    """Run the service until interrupted."""
+    server=make_server(host, port, quiet, max_cells)
+    print(f"serving PVT correlations on http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
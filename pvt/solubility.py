@@ -0,0 +1,80 @@
+"""Gas solubility (Rs) correlations.
+
+Each function evaluates the whole pressure array at once.  When the bubble
+point ``pb`` is given, pressures above it are clamped to ``pb`` so Rs stays
+constant at Rsb there, matching the curves drawn on the Gas Solubility page.
+
+The formulas are written as kernels over the derived fluid terms (Yo, Ygs,
+°R and the ``10**x`` groups) so :func:`Rs_compare` can evaluate all four
+correlations while computing those terms only once.
+"""
+
+import numpy as np
+
+from pvt.common import Yo, Ygs, Rankine, standing_10x, petrosky_10x, switch
+
+
+def _saturated(p, pb):
+    p=np.asarray(p)
+    p=p.astype(np.result_type(p, 1.0), copy=False)
+    return p if pb is None else np.minimum(p, pb)
+
+
+def _beggs_coefficients(api):
+    ## coefficients switch at 30 °API
+    low=api<30
+    return switch(low, 0.0362, 0.0178, api), switch(low, 1.0937, 1.1870, api), switch(low, 25.7240, 23.931, api)
+
+
+## kernels over precomputed terms --------------------------------------------------
+
+def _standing(p, yg, ten_x):
+    return yg*(((p/18.2+1.4)*ten_x)**1.2048)
+
+
+def _beggs(p, api, ygs, TR):
+    C1, C2, C3 = _beggs_coefficients(api)
+    return C1*ygs*(p**C2)*np.exp(C3*(api/TR))
+
+
+def _marhoun(p, yg, yo, TR):
+    a, b, c, d, e = 185.843208, 1.877840, -3.1437, -1.3265, 1.398441
+    return (a*yg**b*yo**c*TR**d*p)**e
+
+
+def _petrosky(p, yg, ten_x):
+    return ((p/112.727+12.340)*yg**0.8439*ten_x)**1.73184
+
+
+## public correlations --------------------------------------------------------------
+
+def Rs_standing(p, api, yg, T, pb=None):
+    """Standing (1947). p in psia, T in °F."""
+    return _standing(_saturated(p, pb), yg, standing_10x(api, T))
+
+
+def Rs_beggs(p, api, yg, T, psep, tsep, pb=None):
+    """Vasquez-Beggs (1980). p in psia, T and tsep in °F, psep in psig."""
+    return _beggs(_saturated(p, pb), api, Ygs(yg, api, psep, tsep), Rankine(T))
+
+
+def Rs_Marhouns(p, api, yg, T, pb=None):
+    """Marhoun (1988). p in psia, T in °F."""
+    return _marhoun(_saturated(p, pb), yg, Yo(api), Rankine(T))
+
+
+def Rs_Petrosky_farshad(p, api, yg, T, pb=None):
+    """Petrosky-Farshad (1993). p in psia, T in °F."""
+    return _petrosky(_saturated(p, pb), yg, petrosky_10x(api, T))
+
+
+def Rs_compare(p, api, yg, T, psep, tsep, pb=None):
+    """All four Rs correlations in one pass, keyed by correlation name."""
+    p=_saturated(p, pb)
+    TR=Rankine(T)
+    return {
+        "Standing": _standing(p, yg, standing_10x(api, T)),
+        "Vasquez-Beggs": _beggs(p, api, Ygs(yg, api, psep, tsep), TR),
+        "Marhoun": _marhoun(p, yg, Yo(api), TR),
+        "Petrosky-Farshad": _petrosky(p, yg, petrosky_10x(api, T)),
+    }
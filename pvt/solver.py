@@ -0,0 +1,97 @@
+"""Batched inversion of Rs correlations for the bubble-point pressure.
+
+:func:`invert_rs` finds, for every row at once, the pressure at which a
+forward Rs correlation returns the given Rs.  It runs a safeguarded Newton
+iteration: each row keeps a bracket [lo, hi] around its root, takes a Newton
+step from a finite-difference slope, and falls back to bisection whenever
+the step leaves the bracket.  Rows drop out of the working set as they
+converge, so later iterations only touch the stragglers.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+SolveResult=namedtuple("SolveResult", ["pb", "converged", "iterations", "residual"])
+SolveResult.__doc__="""Result of :func:`invert_rs`.
+
+pb          pressure (psia) solving rs_func(pb) == rs, NaN where not bracketed
+converged   boolean mask of rows that met the tolerance
+iterations  iterations used per row
+residual    rs_func(pb) - rs per row
+"""
+
+
+def _take(value, idx, shape):
+    ## the slice of a broadcast argument belonging to the active rows
+    if np.ndim(value)==0:
+        return value
+    return np.broadcast_to(value, shape).ravel()[idx]
+
+
+def invert_rs(rs_func, rs, *args, lo=14.7, hi=20000.0, rtol=1e-10, maxiter=100, **kwargs):
+    """Solve ``rs_func(p, *args, **kwargs) == rs`` for p, elementwise.
+
+    ``rs`` and any array arguments broadcast together, one root per element.
+    ``rs_func`` must increase with pressure on [lo, hi] (do not pass ``pb``,
+    which would flatten the curve).  Rows whose Rs lies outside
+    [rs_func(lo), rs_func(hi)] are returned as NaN and not converged.
+    """
+    rs=np.asarray(rs, dtype=float)
+    shape=np.broadcast_shapes(rs.shape, *(np.shape(a) for a in args), *(np.shape(v) for v in kwargs.values()))
+    target=np.broadcast_to(rs, shape).ravel()
+    n=target.size
+
+    def f(p, idx):
+        sub_args=[_take(a, idx, shape) for a in args]
+        sub_kwargs={k: _take(v, idx, shape) for k, v in kwargs.items()}
+        return rs_func(p, *sub_args, **sub_kwargs)-target[idx]
+
+    every=np.arange(n)
+    a=np.full(n, float(lo))
+    b=np.full(n, float(hi))
+    fa=f(a, every)
+    fb=f(b, every)
+    bracketed=(fa<=0)&(fb>=0)
+
+    ## start from the point of the bracket closest to the root by linear interpolation
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p=np.where(bracketed, a-fa*(b-a)/(fb-fa), np.nan)
+    p=np.where(np.isfinite(p), p, (a+b)/2)
+    residual=np.full(n, np.nan)
+    iterations=np.zeros(n, dtype=int)
+    converged=np.zeros(n, dtype=bool)
+
+    active=every[bracketed]
+    for _ in range(maxiter):
+        if active.size==0:
+            break
+        x=p[active]
+        fx=f(x, active)
+        iterations[active]+=1
+        residual[active]=fx
+        done=np.abs(fx)<=rtol*np.maximum(np.abs(target[active]), 1.0)
+        converged[active[done]]=True
+
+        ## shrink the bracket around the root
+        left=fx<0
+        a[active[left]]=x[left]
+        b[active[~left]]=x[~left]
+
+        ## Newton step from a forward-difference slope, bisection when it leaves the bracket
+        h=1e-7*np.maximum(np.abs(x), 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope=(f(x+h, active)-fx)/h
+            step=x-fx/slope
+        aa, bb = a[active], b[active]
+        bad=~np.isfinite(step)|(step<=aa)|(step>=bb)
+        step=np.where(bad, (aa+bb)/2, step)
+        ## also stop rows whose bracket has collapsed to floating-point width
+        tight=(bb-aa)<=4*np.finfo(float).eps*np.maximum(np.abs(bb), 1.0)
+        converged[active[tight]]=True
+        moving=~(done|tight)
+        p[active[moving]]=step[moving]
+        active=active[moving]
+
+    pb=np.where(bracketed, p, np.nan)
+    return SolveResult(pb.reshape(shape), converged.reshape(shape), iterations.reshape(shape), residual.reshape(shape))
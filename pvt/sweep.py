@@ -0,0 +1,311 @@
+"""Disk-backed sensitivity sweeps over fluid inputs.
+
+A sweep evaluates every combination of a few input axes (e.g. T x API x Yg)
+at a shared pressure array, for one or more correlation variants.  Results
+go into a single memory-mapped ``.npy`` array laid out as
+
+    (variant, property, *input axes, pressure)
+
+so a curve against pressure is one contiguous row and slicing it is a view
+of the file, never a copy.  The input combinations are evaluated in blocks
+of rows through :func:`pvt.batch.batch_arrays`; after each block the array
+is flushed and the block count is recorded in ``meta.json``, so an
+interrupted sweep resumes from the last completed block.
+
+:func:`sweep` holds a lock file in the directory while it fills the cube, so
+two processes or sessions starting the same sweep compute it once: the
+second waits and then finds it complete.  Directories of sweeps kept as a
+cache (the Sensitivity Sweep page's) are deleted by :func:`prune` once they
+are too old or too large together, and by :func:`remove` on request.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows locks with msvcrt
+    fcntl=None
+    import msvcrt
+
+from pvt.batch import (
+    PROPERTIES,
+    WELL_COLUMNS,
+    RS_CORRELATIONS,
+    PB_CORRELATIONS,
+    BO_CORRELATIONS,
+    CO_CORRELATIONS,
+    UOD_CORRELATIONS,
+    UOB_CORRELATIONS,
+    batch_arrays,
+    check_dtype,
+)
+
+VALUES="values.npy"
+META="meta.json"
+LOCK="sweep.lock"
+
+## sweep directories kept by prune(): total size and age since last use
+MAX_BYTES=int(float(os.environ.get("PVT_SWEEP_MB", "2048"))*2**20)
+MAX_AGE=float(os.environ.get("PVT_SWEEP_DAYS", "7"))*86400
+
+## (rows x pressures) elements evaluated per block
+BLOCK_ELEMENTS=1<<20
+
+REGISTRIES={"rs": RS_CORRELATIONS, "pb": PB_CORRELATIONS, "bo": BO_CORRELATIONS,
+            "co": CO_CORRELATIONS, "uod": UOD_CORRELATIONS, "uob": UOB_CORRELATIONS}
+
+
+def _write_meta(path, meta):
+    ## write-then-rename so a crash never leaves a half-written meta.json
+    tmp=os.path.join(path, META+".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(path, META))
+
+
+def _lock(f, blocking):
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX|(0 if blocking else fcntl.LOCK_NB))
+        except OSError as err:
+            raise BlockingIOError(f"sweep {os.path.dirname(f.name)} is in use") from err
+        return
+    f.seek(0)
+    while True:  # pragma: no cover - Windows
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if not blocking:
+                raise BlockingIOError(f"sweep {os.path.dirname(f.name)} is in use") from None
+            time.sleep(0.1)
+
+
+@contextlib.contextmanager
+def locked(path, blocking=True):
+    """Hold the lock of sweep directory ``path`` (created if needed).
+
+    Waits for another holder to finish; with ``blocking=False`` raises
+    :class:`BlockingIOError` instead.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK), "a+") as f:
+        _lock(f, blocking)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def remove(path):
+    """Delete sweep directory ``path``; False, leaving it alone, while a sweep is filling it."""
+    if not os.path.isdir(path):
+        return False
+    try:
+        with locked(path, blocking=False):
+            for name in os.listdir(path):
+                if name!=LOCK:
+                    os.remove(os.path.join(path, name))
+    except BlockingIOError:
+        return False
+    ## the lock file goes last, once released
+    with contextlib.suppress(OSError):
+        os.remove(os.path.join(path, LOCK))
+        os.rmdir(path)
+    return True
+
+
+def prune(root, max_bytes=MAX_BYTES, max_age=MAX_AGE, keep=()):
+    """Delete sweep directories under ``root`` unused for ``max_age`` seconds, then the
+    least recently used ones until they take at most ``max_bytes`` together.
+
+    A directory's last use is its modification time (filling a block renames
+    meta.json into it; viewers touch it with ``os.utime``).  Directories in
+    ``keep`` and sweeps being filled are skipped.  Returns the deleted paths.
+    """
+    if not os.path.isdir(root):
+        return []
+    entries=[]
+    for name in os.listdir(root):
+        path=os.path.join(root, name)
+        if os.path.isdir(path):
+            size=sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+    entries.sort()
+    total=sum(size for _, size, _ in entries)
+    keep={os.path.abspath(k) for k in keep}
+    now=time.time()
+    removed=[]
+    for mtime, size, path in entries:
+        if total<=max_bytes and now-mtime<=max_age:
+            break
+        if os.path.abspath(path) not in keep and remove(path):
+            total-=size
+            removed.append(path)
+    return removed
+
+
+def _spec(axes, p, props, fixed, variants, dtype="float64"):
+    ## the sweep definition, normalised to what meta.json stores, after checking it
+    axes={column: [float(v) for v in values] for column, values in axes.items()}
+    fixed={column: float(v) for column, v in (fixed or {}).items()}
+    variants={label: dict(c) for label, c in (variants or {"default": {}}).items()}
+    props=list(props)
+    unknown=(set(axes)|set(fixed))-set(WELL_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown inputs: {', '.join(sorted(unknown))}")
+    missing=[c for c in WELL_COLUMNS if c not in axes and c not in fixed and c!="Pb"]
+    if missing:
+        raise ValueError(f"sweep needs axes or fixed values for: {', '.join(missing)}")
+    for label, correlations in variants.items():
+        for key, name in correlations.items():
+            if key not in REGISTRIES:
+                raise ValueError(f"variant {label}: unknown correlation '{key}' (choose from {', '.join(REGISTRIES)})")
+            if name not in REGISTRIES[key]:
+                raise ValueError(f"variant {label}: unknown {key} correlation '{name}' "
+                                 f"(choose from {', '.join(REGISTRIES[key])})")
+    if set(props)-set(PROPERTIES):
+        raise ValueError(f"unknown properties: {', '.join(sorted(set(props)-set(PROPERTIES)))}")
+    return {"axes": axes, "pressure": [float(v) for v in p], "props": props, "fixed": fixed, "variants": variants,
+            "dtype": str(check_dtype(dtype))}
+
+
+class SweepCube:
+    """A sweep on disk: coordinates in ``meta.json``, values in a memory-mapped array."""
+
+    def __init__(self, path, mode="r"):
+        self.path=str(path)
+        with open(os.path.join(self.path, META)) as f:
+            self.meta=json.load(f)
+        self.values=np.load(os.path.join(self.path, VALUES), mmap_mode=mode)
+
+    @classmethod
+    def create(cls, path, axes, p, props=("rs", "bo"), fixed=None, variants=None, block_rows=None, dtype="float64"):
+        """Allocate an empty cube in directory ``path`` (created if needed).
+
+        ``axes`` maps batch well columns to the values to sweep, in axis
+        order, e.g. ``{"T": [200, 250], "API": [30, 35, 40]}``.  ``fixed``
+        gives every other input (Psep, Tsep, Rsb and optionally Pb).
+        ``variants`` maps a label to the correlations passed to
+        :func:`pvt.batch.batch_arrays`, e.g. ``{"Standing": {}, "Marhoun":
+        {"bo": "Marhoun"}}``.  ``dtype="float32"`` halves the file and computes
+        in single precision.
+        """
+        meta=_spec(axes, p, props, fixed, variants, dtype)
+        axes, p, variants = meta["axes"], meta["pressure"], meta["variants"]
+        meta["block_rows"]=int(block_rows or max(1, BLOCK_ELEMENTS//len(p)))
+        meta["rows"]=int(np.prod([len(v) for v in axes.values()]))
+        meta["completed"]=0
+        os.makedirs(path, exist_ok=True)
+        shape=(len(variants), len(meta["props"]), *(len(v) for v in axes.values()), len(p))
+        values=np.lib.format.open_memmap(os.path.join(path, VALUES), mode="w+", dtype=meta["dtype"], shape=shape)
+        values[...]=np.nan
+        values.flush()
+        del values
+        _write_meta(path, meta)
+        return cls(path, mode="r+")
+
+    @property
+    def axes(self):
+        return {column: np.array(values) for column, values in self.meta["axes"].items()}
+
+    @property
+    def pressure(self):
+        return np.array(self.meta["pressure"])
+
+    @property
+    def blocks(self):
+        return -(-self.meta["rows"]//self.meta["block_rows"])
+
+    @property
+    def complete(self):
+        return self.meta["completed"]>=self.blocks
+
+    def _wells(self, start, stop):
+        ## well table for flat input rows [start, stop) of the axis product, in C order
+        axes=self.meta["axes"]
+        shape=[len(v) for v in axes.values()]
+        index=np.unravel_index(np.arange(start, stop), shape)
+        table={column: np.asarray(values)[i] for (column, values), i in zip(axes.items(), index)}
+        table.update((column, np.full(stop-start, value)) for column, value in self.meta["fixed"].items())
+        return pd.DataFrame(table)
+
+    def run(self, progress=None, max_blocks=None):
+        """Evaluate the remaining blocks; ``progress(done, total)`` is called after each."""
+        if self.values.mode!="r+":
+            self.values=np.load(os.path.join(self.path, VALUES), mmap_mode="r+")
+        meta=self.meta
+        rows, step, m = meta["rows"], meta["block_rows"], len(meta["pressure"])
+        flat=self.values.reshape(len(meta["variants"]), len(meta["props"]), rows, m)
+        done=0
+        for block in range(meta["completed"], self.blocks):
+            if max_blocks is not None and done>=max_blocks:
+                break
+            start, stop = block*step, min((block+1)*step, rows)
+            wells=self._wells(start, stop)
+            for v, correlations in enumerate(meta["variants"].values()):
+                arrays=batch_arrays(wells, meta["pressure"], tuple(meta["props"]),
+                                    dtype=meta["dtype"], **correlations)
+                for k, name in enumerate(meta["props"]):
+                    flat[v, k, start:stop]=arrays[name]
+            ## the values must be on disk before the block is recorded as done
+            self.values.flush()
+            meta["completed"]=block+1
+            _write_meta(self.path, meta)
+            done+=1
+            if progress is not None:
+                progress(meta["completed"], self.blocks)
+        return self
+
+    def _index(self, column, value):
+        values=np.asarray(self.meta["axes"][column])
+        hit=np.flatnonzero(np.isclose(values, value, rtol=1e-9, atol=0))
+        if hit.size==0:
+            raise ValueError(f"{column}={value} is not on the sweep axis ({', '.join(f'{v:g}' for v in values)})")
+        return int(hit[0])
+
+    def sel(self, prop, variant=None, **coords):
+        """View of ``prop`` at the given axis values, e.g. ``sel("bo", T=250, API=35)``.
+
+        Axes not named stay in the result, pressure last.  The view reads the
+        memory-mapped file directly; nothing is copied until it is used.
+        """
+        variants=list(self.meta["variants"])
+        if variant is None and len(variants)>1:
+            raise ValueError(f"choose a variant: {', '.join(variants)}")
+        unknown=set(coords)-set(self.meta["axes"])
+        if unknown:
+            raise ValueError(f"not a sweep axis: {', '.join(sorted(unknown))}")
+        index=[variants.index(variant) if variant is not None else 0, self.meta["props"].index(prop)]
+        index+=[self._index(column, coords[column]) if column in coords else slice(None)
+                for column in self.meta["axes"]]
+        return self.values[tuple(index)]
+
+
+def sweep(path, axes, p, props=("rs", "bo"), fixed=None, variants=None, block_rows=None, progress=None,
+          dtype="float64"):
+    """Run a sweep into ``path``, resuming it if the same sweep was started there before.
+
+    See :meth:`SweepCube.create` for the arguments.  A directory holding a
+    different sweep is an error rather than being overwritten.  While another
+    process fills the same directory this waits for it, then resumes.
+    """
+    with locked(path):
+        if os.path.exists(os.path.join(path, META)):
+            cube=SweepCube(path, mode="r+")
+            spec=_spec(axes, p, props, fixed, variants, dtype)
+            if {k: cube.meta.get(k) for k in spec}!=spec:
+                raise ValueError(f"{path} holds a different sweep; use another directory")
+        else:
+            cube=SweepCube.create(path, axes, p, props, fixed, variants, block_rows, dtype)
+        return cube.run(progress)
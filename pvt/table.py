@@ -0,0 +1,119 @@
+"""Precomputed PVT tables for fast repeated lookups.
+
+A :class:`PVTTable` evaluates the correlations once for a single fluid on a
+dense pressure grid (with Pb always on a node, so the kink is exact) and then
+answers batched pressure queries by linear interpolation on the sorted grid.
+Tables are plain arrays plus a little JSON metadata, so they pickle cheaply
+and can be saved to ``.npz`` and loaded in another process.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from pvt.batch import COLUMNS, WELL_COLUMNS, batch_arrays
+
+DEFAULT_PROPERTIES=("rs", "bo", "uo")
+
+
+class PVTTable:
+    """Rs, Bo, Co and/or uo of one fluid tabulated against pressure."""
+
+    def __init__(self, pressure, values, fluid, correlations=None):
+        self.pressure=np.asarray(pressure, dtype=float)
+        self.values={name: np.asarray(v, dtype=float) for name, v in values.items()}
+        self.fluid=dict(fluid)
+        self.correlations=dict(correlations or {})
+        self._layout=self._uniform_layout()
+        with np.errstate(invalid="ignore"):
+            self._slopes={name: np.diff(v)/np.diff(self.pressure) for name, v in self.values.items()}
+
+    @classmethod
+    def build(cls, fluid, pmin=14.7, pmax=10000.0, points=4001, props=DEFAULT_PROPERTIES, **correlations):
+        """Tabulate ``props`` for ``fluid`` (a mapping with the batch well columns).
+
+        ``correlations`` are passed to :func:`pvt.batch.batch_arrays`, e.g.
+        ``bo="Glaso"``.  The bubble point is added to the grid as an exact node.
+        """
+        fluid={k: float(v) for k, v in fluid.items() if k in WELL_COLUMNS}
+        if "Pb" not in fluid:
+            fluid["Pb"]=float(batch_arrays(pd.DataFrame([fluid]), [pmin], ("pb",), **correlations)["pb"][0, 0])
+        p=np.linspace(pmin, pmax, points)
+        if pmin<fluid["Pb"]<pmax:
+            p=np.union1d(p, [fluid["Pb"]])
+        arrays=batch_arrays(pd.DataFrame([fluid]), p, tuple(props), **correlations)
+        return cls(p, {name: a[0] for name, a in arrays.items()}, fluid, correlations)
+
+    def _uniform_layout(self):
+        ## (start, step, kink) when the grid is evenly spaced apart from an inserted Pb node
+        p=self.pressure
+        kinks=[self.fluid["Pb"]] if "Pb" in self.fluid else []
+        for kink in kinks+[None]:
+            base=p if kink is None else p[p!=kink]
+            if (kink is not None and len(base)==len(p)) or len(base)<2:
+                continue
+            step=(base[-1]-base[0])/(len(base)-1)
+            if np.allclose(np.diff(base), step, rtol=1e-9, atol=0):
+                return base[0], step, len(base), kink
+        return None
+
+    def _locate(self, p):
+        ## interval index and offset into it per query point, shared by every property; queries outside
+        ## the grid clamp to its ends
+        grid=self.pressure
+        p=np.clip(np.asarray(p, dtype=float), grid[0], grid[-1])
+        if self._layout is None:
+            idx=np.searchsorted(grid, p, side="right")-1
+        else:
+            ## evenly spaced knots need no search: the base interval is arithmetic and the Pb node
+            ## shifts every interval at or above it by one
+            start, step, n, kink = self._layout
+            idx=((p-start)*(1/step)).astype(np.intp)
+            if kink is not None:
+                idx+=p>=kink
+        np.clip(idx, 0, len(grid)-2, out=idx)
+        return idx, p-grid[idx]
+
+    def query(self, p, props=None):
+        """Interpolated properties at pressures ``p``: a dict, or one array if ``props`` is a name."""
+        idx, dx = self._locate(p)
+        names=[props] if isinstance(props, str) else list(props or self.values)
+        out={name: self.values[name][idx]+self._slopes[name][idx]*dx for name in names}
+        return out[props] if isinstance(props, str) else out
+
+    def to_frame(self):
+        """The table as a DataFrame with the batch output column names."""
+        return pd.DataFrame({"Pressure(psia)": self.pressure, **{COLUMNS[k]: v for k, v in self.values.items()}})
+
+    def interpolation_error(self, samples=4):
+        """Largest relative error per property against the direct correlations.
+
+        Checks ``samples`` points inside every grid interval, where linear
+        interpolation is least accurate.
+        """
+        grid=self.pressure
+        frac=(np.arange(samples)+1)/(samples+1)
+        p=(grid[:-1, None]+np.diff(grid)[:, None]*frac).ravel()
+        exact=batch_arrays(pd.DataFrame([self.fluid]), p, tuple(self.values), **self.correlations)
+        approx=self.query(p)
+        errors={}
+        for name in self.values:
+            ref=exact[name][0]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rel=np.abs(approx[name]-ref)/np.abs(ref)
+            errors[name]=float(np.nanmax(rel)) if np.isfinite(rel).any() else 0.0
+        return errors
+
+    def save(self, path):
+        """Write the table to an ``.npz`` file readable by :meth:`load`."""
+        meta=json.dumps({"fluid": self.fluid, "correlations": self.correlations})
+        np.savez(path, pressure=self.pressure, meta=np.array(meta),
+                 **{f"value_{name}": v for name, v in self.values.items()})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta=json.loads(str(data["meta"]))
+            values={key[len("value_"):]: data[key] for key in data.files if key.startswith("value_")}
+            return cls(data["pressure"], values, meta["fluid"], meta["correlations"])
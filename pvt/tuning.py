@@ -0,0 +1,229 @@
+"""Regression of correlation coefficients against lab data.
+
+Each tunable correlation is written with its constants as a ``coef`` tuple
+(see :data:`pvt.fvf.STANDING_BO` and :data:`pvt.fvf.MARHOUN_BO`) and comes
+with an analytic Jacobian.  :func:`fit` tunes every basin of a lab table at
+once: the basins are padded into one (basins x points) array and a
+Levenberg-Marquardt iteration runs on all of them together, solving the
+stacked normal equations with one batched ``np.linalg.solve`` per step.
+Basins that converge are dropped from the working set.
+
+Tuned sets are kept in a JSON coefficient library keyed by correlation and
+set name, which the pages read to offer tuned coefficients.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pvt.common import Yo
+from pvt.fvf import MARHOUN_BO, STANDING_BO, Bo_Marhoun, Bo_Standing
+
+## lab table column -> correlation argument name
+LAB_COLUMNS={"Rs": "rs", "API": "api", "Yg": "yg", "T": "T", "Bo": "bo"}
+
+Model=namedtuple("Model", ["func", "jacobian", "names", "default", "target"])
+
+## library file used by the pages unless PVT_COEFFICIENTS points elsewhere
+LIBRARY=os.environ.get("PVT_COEFFICIENTS", os.path.join(os.path.expanduser("~"), ".pvt", "coefficients.json"))
+
+
+def _log(x):
+    ## log that is 0 where x<=0; those terms are multiplied by zero anyway
+    return np.log(np.where(x>0, x, 1.0))
+
+
+def _standing_jacobian(rs, api, yg, T, coef):
+    c0, c1, c2, c3, c4 = coef
+    g=yg/Yo(api)
+    gc=rs*g**c2
+    u=gc+c3*T
+    uc=u**c4
+    du=c1*c4*u**(c4-1)
+    return np.stack([np.ones_like(uc), uc, du*gc*_log(g), du*T, c1*uc*_log(u)], axis=-1)
+
+
+def _marhoun_jacobian(rs, api, yg, T, coef):
+    a, b, c, d0, d1, d2, d3 = coef
+    yo=Yo(api)
+    F=rs**a*yg**b*yo**c
+    dF=(d2+2*d3*F)*F
+    TR=T+460+0*F
+    return np.stack([dF*_log(rs), dF*_log(yg), dF*_log(yo), np.ones_like(F), TR, F, F*F], axis=-1)
+
+
+MODELS={
+    "Bo Standing": Model(Bo_Standing, _standing_jacobian, ("c0", "c1", "c2", "c3", "c4"), STANDING_BO, "bo"),
+    "Bo Marhoun": Model(Bo_Marhoun, _marhoun_jacobian, ("a", "b", "c", "d0", "d1", "d2", "d3"), MARHOUN_BO, "bo"),
+}
+
+FitResult=namedtuple("FitResult", ["model", "coefficients", "stats", "seconds"])
+FitResult.__doc__="""Result of :func:`fit`.
+
+model         name of the tuned correlation
+coefficients  DataFrame, one row of tuned coefficients per basin
+stats         DataFrame per basin: points, iterations, converged, RMSE and
+              average absolute relative error (%) before and after tuning
+seconds       wall time of the fit
+"""
+
+
+def _pad(groups):
+    ## (basins x max points) arrays per input and a mask of real points
+    size=max(len(g) for g in groups)
+    mask=np.zeros((len(groups), size), dtype=bool)
+    arrays={name: np.ones((len(groups), size)) for name in LAB_COLUMNS.values()}
+    for i, g in enumerate(groups):
+        mask[i, :len(g)]=True
+        for column, name in LAB_COLUMNS.items():
+            values=g[column].to_numpy(dtype=float)
+            arrays[name][i, :len(g)]=values
+            ## padding repeats a real point so the model stays finite there
+            arrays[name][i, len(g):]=values[0]
+    return arrays, mask
+
+
+def _levenberg_marquardt(model, x, y, mask, theta, maxiter=1000, ftol=1e-10, xtol=1e-8):
+    ## batched LM with Marquardt's diagonal scaling; theta is (basins x coefficients)
+    n, k = theta.shape
+    w=mask.astype(float)
+
+    def residual(th, idx):
+        args=[x[name][idx] for name in ("rs", "api", "yg", "T")]
+        return (model.func(*args, coef=tuple(th.T[:, :, None]))-y[idx])*w[idx]
+
+    def cost(r):
+        return np.einsum("ij,ij->i", r, r)
+
+    lam=np.full(n, 1e-3)
+    iterations=np.zeros(n, dtype=int)
+    converged=np.zeros(n, dtype=bool)
+    r=residual(theta, slice(None))
+    c=cost(r)
+    active=np.arange(n)
+    for _ in range(maxiter):
+        if active.size==0:
+            break
+        th=theta[active]
+        args=[x[name][active] for name in ("rs", "api", "yg", "T")]
+        J=model.jacobian(*args, tuple(th.T[:, :, None]))*w[active][:, :, None]
+        A=np.einsum("bik,bil->bkl", J, J)
+        g=np.einsum("bik,bi->bk", J, r[active])
+        diag=np.einsum("bkk->bk", A)
+        damped=A+(lam[active][:, None]*np.maximum(diag, 1e-300))[:, :, None]*np.eye(k)
+        step=np.linalg.solve(damped, -g[:, :, None])[:, :, 0]
+        trial=th+step
+        with np.errstate(all="ignore"):
+            r_trial=residual(trial, active)
+            c_trial=cost(r_trial)
+        better=np.isfinite(c_trial)&(c_trial<c[active])
+        iterations[active]+=1
+
+        ## accepted steps shrink the damping towards Gauss-Newton, rejected ones grow it
+        idx=active[better]
+        gain=(c[idx]-c_trial[better])/np.maximum(c[idx], 1e-300)
+        theta[idx]=trial[better]
+        r[idx]=r_trial[better]
+        c[idx]=c_trial[better]
+        lam[idx]/=3
+        lam[active[~better]]*=4
+
+        ## stop when an accepted step barely lowers the cost or no coefficient moves
+        small=np.abs(step)<=xtol*np.maximum(np.abs(th), 1e-12)
+        done=np.zeros(active.size, dtype=bool)
+        done[better]=gain<=ftol
+        done|=small.all(axis=1)|(lam[active]>1e16)
+        converged[active[done]]=True
+        active=active[~done]
+    return theta, iterations, converged
+
+
+def _errors(model, x, y, mask, theta):
+    args=[x[name] for name in ("rs", "api", "yg", "T")]
+    pred=model.func(*args, coef=tuple(theta.T[:, :, None]))
+    err=np.where(mask, pred-y, 0.0)
+    points=mask.sum(axis=1)
+    rmse=np.sqrt((err**2).sum(axis=1)/points)
+    aare=100*np.where(mask, np.abs(err/y), 0.0).sum(axis=1)/points
+    return rmse, aare
+
+
+def fit(data, model="Bo Standing", basin="Basin", start=None, maxiter=1000):
+    """Tune ``model`` coefficients for every basin of a lab table.
+
+    ``data`` has the columns Rs, API, Yg, T (°F) and the measured Bo, plus
+    an optional ``basin`` column; without it the whole table is one set.
+    ``start`` overrides the published coefficients as the starting point.
+    """
+    spec=MODELS[model]
+    missing=[c for c in LAB_COLUMNS if c not in data.columns]
+    if missing:
+        raise ValueError(f"lab data is missing column(s): {', '.join(missing)}")
+    data=data.dropna(subset=list(LAB_COLUMNS))
+    if basin in data.columns:
+        names, groups = zip(*data.groupby(basin, sort=True)) if len(data) else ((), ())
+    else:
+        names, groups = ("all",), (data,)
+    groups=[g for g in groups if len(g)>0]
+    if not groups:
+        raise ValueError("lab data has no complete rows")
+    small=[str(n) for n, g in zip(names, groups) if len(g)<len(spec.names)]
+    if small:
+        raise ValueError(f"basin(s) with fewer points than the {len(spec.names)} coefficients: {', '.join(small)}")
+
+    start_time=time.perf_counter()
+    x, mask = _pad(groups)
+    y=x.pop(spec.target)
+    theta0=np.tile(np.asarray(start or spec.default, dtype=float), (len(groups), 1))
+    theta, iterations, converged = _levenberg_marquardt(spec, x, y, mask, theta0.copy(), maxiter)
+    seconds=time.perf_counter()-start_time
+
+    rmse0, aare0 = _errors(spec, x, y, mask, theta0)
+    rmse, aare = _errors(spec, x, y, mask, theta)
+    index=pd.Index([str(n) for n in names], name=basin)
+    coefficients=pd.DataFrame(theta, index=index, columns=list(spec.names))
+    stats=pd.DataFrame({
+        "Points": mask.sum(axis=1),
+        "Iterations": iterations,
+        "Converged": converged,
+        "RMSE published": rmse0,
+        "RMSE tuned": rmse,
+        "AARE published(%)": aare0,
+        "AARE tuned(%)": aare,
+    }, index=index)
+    return FitResult(model, coefficients, stats, seconds)
+
+
+def load_library(path=None):
+    """The coefficient library: {model: {set name: [coefficients]}}, empty if missing."""
+    path=path or LIBRARY
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_sets(result, path=None, prefix=""):
+    """Add every basin of a :class:`FitResult` to the library as ``prefix + basin``."""
+    path=path or LIBRARY
+    library=load_library(path)
+    sets=library.setdefault(result.model, {})
+    for name, row in result.coefficients.iterrows():
+        sets[f"{prefix}{name}"]=[float(v) for v in row]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp=path+".tmp"
+    with open(tmp, "w") as f:
+        json.dump(library, f, indent=1)
+    os.replace(tmp, path)
+    return library
+
+
+def coefficient_sets(model, path=None):
+    """{set name: coefficient tuple} for ``model``, the published set first."""
+    sets={"Published": tuple(MODELS[model].default)}
+    sets.update((name, tuple(coef)) for name, coef in load_library(path).get(model, {}).items())
+    return sets
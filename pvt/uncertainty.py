@@ -0,0 +1,181 @@
+"""Monte Carlo uncertainty bands for PVT properties.
+
+Each uncertain fluid input (API, Yg, T, Rsb, ...) is drawn from a
+distribution, and every sample is treated as one well of a batch: the
+(samples x pressures) grid goes through :func:`pvt.batch.batch_arrays` as a
+single array pass.  Samples are processed in blocks so memory stays bounded
+for millions of samples.  Percentiles per pressure point are accumulated in
+per-pressure histograms over two passes (the first finds each pressure's
+range, the second bins into it); the same seeded streams are replayed for
+the second pass, so no sample is stored.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pvt.batch import COLUMNS, WELL_COLUMNS, batch_arrays
+
+## name -> (sampler, parameter names); samplers take (rng, size, *params)
+DISTRIBUTIONS={
+    "fixed": (lambda rng, size, value: np.full(size, float(value)), ("value",)),
+    "uniform": (lambda rng, size, low, high: rng.uniform(low, high, size), ("low", "high")),
+    "normal": (lambda rng, size, mean, sd: rng.normal(mean, sd, size), ("mean", "sd")),
+    "lognormal": (lambda rng, size, mean, sd: rng.lognormal(np.log(mean**2/np.sqrt(sd**2+mean**2)),
+                                                            np.sqrt(np.log(1+sd**2/mean**2)), size),
+                  ("mean", "sd")),
+    "triangular": (lambda rng, size, low, mode, high: rng.triangular(low, mode, high, size),
+                   ("low", "mode", "high")),
+}
+
+PERCENTILES=(10, 50, 90)
+
+## (samples x pressures) elements evaluated per block, about 8 MB per intermediate array
+BLOCK_ELEMENTS=1<<20
+BINS=4096
+
+MonteCarloResult=namedtuple("MonteCarloResult", ["pressure", "bands", "mean", "std", "resolution", "samples"])
+MonteCarloResult.__doc__="""Result of :func:`monte_carlo`.
+
+pressure    the pressure points (psia)
+bands       {property: {percentile: array over pressure}}
+mean, std   {property: array over pressure}, over the finite samples
+resolution  {property: array over pressure}, histogram bin width (largest percentile error)
+samples     number of samples drawn
+"""
+
+
+def _spec(value):
+    ## a bare number is a fixed input; otherwise (distribution, *params)
+    if np.isscalar(value):
+        return ("fixed", value)
+    name, *params = value
+    if name not in DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution '{name}' (choose from {', '.join(DISTRIBUTIONS)})")
+    if len(params)!=len(DISTRIBUTIONS[name][1]):
+        raise ValueError(f"{name} takes {', '.join(DISTRIBUTIONS[name][1])}")
+    return (name, *params)
+
+
+def _streams(inputs, seed):
+    ## one generator per input, so draws do not depend on the block size or on the other inputs
+    children=np.random.SeedSequence(seed).spawn(len(inputs))
+    return {column: np.random.default_rng(child) for column, child in zip(inputs, children)}
+
+
+def _blocks(inputs, n_samples, block_size, seed):
+    ## sampled well tables of at most block_size rows, identical on every call with the same seed
+    rngs=_streams(inputs, seed)
+    for start in range(0, n_samples, block_size):
+        size=min(block_size, n_samples-start)
+        block={}
+        for column, (name, *params) in inputs.items():
+            sampler=DISTRIBUTIONS[name][0]
+            block[column]=sampler(rngs[column], size, *params)
+        yield pd.DataFrame(block)
+
+
+def sample_inputs(inputs, n_samples, seed=None):
+    """The sampled input table (one row per sample) that :func:`monte_carlo` evaluates."""
+    inputs={column: _spec(value) for column, value in inputs.items()}
+    return next(_blocks(inputs, n_samples, max(n_samples, 1), seed))
+
+
+def _histogram_percentiles(counts, lo, width, q):
+    ## percentile q of binned data per column, interpolating linearly inside the bin
+    total=counts.sum(axis=0)
+    cdf=np.cumsum(counts, axis=0)
+    target=q/100*total
+    k=np.argmax(cdf>=np.maximum(target, 1e-12), axis=0)
+    cols=np.arange(counts.shape[1])
+    below=np.where(k>0, cdf[k-1, cols], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac=np.clip((target-below)/counts[k, cols], 0, 1)
+    value=lo+width*(k+frac)
+    return np.where(total>0, value, np.nan)
+
+
+def monte_carlo(inputs, p, props=("bo",), n_samples=100_000, percentiles=PERCENTILES, seed=None,
+                block_size=None, bins=BINS, **correlations):
+    """Percentile bands of ``props`` at pressures ``p`` over sampled fluid inputs.
+
+    ``inputs`` maps the batch well columns (API, Yg, T, Psep, Tsep, Rsb and
+    optionally Pb) to a fixed number or a ``(distribution, *params)`` tuple,
+    e.g. ``{"API": ("normal", 35, 2), "T": ("uniform", 180, 220)}``; see
+    :data:`DISTRIBUTIONS`.  Without a Pb input each sample's bubble point
+    comes from the Pb correlation.  ``correlations`` are passed to
+    :func:`pvt.batch.batch_arrays`, e.g. ``bo="Marhoun", uob="Beggs-Robinson"``.
+    ``P10`` is the 10th percentile.  The same ``seed`` reproduces the same
+    result whatever the block size.
+    """
+    unknown=set(inputs)-set(WELL_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown inputs: {', '.join(sorted(unknown))}")
+    inputs={column: _spec(value) for column, value in inputs.items()}
+    p=np.atleast_1d(np.asarray(p, dtype=float))
+    props=tuple(props)
+    m=len(p)
+    block_size=block_size or max(1, BLOCK_ELEMENTS//m)
+    if seed is None:
+        ## both passes must see the same samples
+        seed=np.random.SeedSequence().entropy
+
+    ## pass 1: range and moments per pressure point (block moments merged with Chan's update)
+    lo={name: np.full(m, np.inf) for name in props}
+    hi={name: np.full(m, -np.inf) for name in props}
+    count={name: np.zeros(m) for name in props}
+    mean={name: np.zeros(m) for name in props}
+    m2={name: np.zeros(m) for name in props}
+    for wells in _blocks(inputs, n_samples, block_size, seed):
+        arrays=batch_arrays(wells, p, props, **correlations)
+        for name, values in arrays.items():
+            finite=np.isfinite(values)
+            lo[name]=np.fmin(lo[name], np.where(finite, values, np.inf).min(axis=0))
+            hi[name]=np.fmax(hi[name], np.where(finite, values, -np.inf).max(axis=0))
+            n_b=finite.sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean_b=np.where(n_b>0, np.where(finite, values, 0.0).sum(axis=0)/n_b, 0.0)
+                m2_b=np.where(finite, values-mean_b, 0.0)
+                m2_b=(m2_b*m2_b).sum(axis=0)
+                n=count[name]+n_b
+                delta=mean_b-mean[name]
+                mean[name]=np.where(n>0, mean[name]+delta*n_b/n, 0.0)
+                m2[name]=np.where(n>0, m2[name]+m2_b+delta*delta*count[name]*n_b/n, 0.0)
+            count[name]=n
+
+    ## pass 2: histogram of every pressure column on its own range
+    width={}
+    for name in props:
+        span=np.where(np.isfinite(hi[name]-lo[name]), hi[name]-lo[name], 0.0)
+        lo[name]=np.where(np.isfinite(lo[name]), lo[name], 0.0)
+        width[name]=np.maximum(span, np.abs(lo[name])*1e-12+1e-300)/bins
+    counts={name: np.zeros(bins*m, dtype=np.int64) for name in props}
+    cols=np.arange(m)
+    for wells in _blocks(inputs, n_samples, block_size, seed):
+        arrays=batch_arrays(wells, p, props, **correlations)
+        for name, values in arrays.items():
+            finite=np.isfinite(values)
+            k=np.where(finite, (values-lo[name])/width[name], 0.0)
+            flat=np.clip(k, 0, bins-1).astype(np.int64)*m+cols
+            counts[name]+=np.bincount(flat[finite], minlength=bins*m)
+
+    bands, std = {}, {}
+    for name in props:
+        hist=counts[name].reshape(bins, m)
+        bands[name]={q: _histogram_percentiles(hist, lo[name], width[name], q) for q in percentiles}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean[name]=np.where(count[name]>0, mean[name], np.nan)
+            std[name]=np.sqrt(m2[name]/count[name])
+    return MonteCarloResult(p, bands, mean, std, width, n_samples)
+
+
+def to_frame(result):
+    """The bands as a table: pressure plus P10/P50/P90, mean and std columns per property."""
+    table={"Pressure(psia)": result.pressure}
+    for name, bands in result.bands.items():
+        for q, values in bands.items():
+            table[f"P{q:g} {COLUMNS[name]}"]=values
+        table[f"Mean {COLUMNS[name]}"]=result.mean[name]
+        table[f"Std {COLUMNS[name]}"]=result.std[name]
+    return pd.DataFrame(table)
@@ -0,0 +1,50 @@
+"""Dead, saturated and undersaturated oil viscosity correlations (cp)."""
+
+import numpy as np
+
+
+## Dead oil -----------------------------------------------------------------------
+
+def uod_Beal(api, T):
+    """Beal (1946). T in °F."""
+    a=10**(0.43+8.33/api)
+    return (0.32+1.8*10**7/api**4.53)*(360/(T+200))**a
+
+
+def uod_Beggs_Robinson(api, T):
+    """Beggs-Robinson (1975). T in °F."""
+    Z=3.0324-0.02023*api
+    X=10**Z*T**(-1.163)
+    return 10**X-1
+
+
+def uod_Glaso(api, T):
+    """Glaso (1980). T in °F."""
+    a=10.313*np.log10(T)-36.447
+    return 3.141*10**10*T**(-3.444)*(np.log10(api))**a
+
+
+## Saturated oil ------------------------------------------------------------------
+
+def uob_Chew_Connally(rs, uod):
+    """Chew-Connally (1959) live-oil viscosity from the dead-oil value uod."""
+    c, d, e = 8.62*10**(-5)*rs, 1.1*10**(-3)*rs, 3.74*10**(-3)*rs
+    b=0.68/10**c+0.25/10**d+0.062/10**e
+    a=rs*(2.2*10**(-7)*rs-7.4*10**(-4))
+    return 10**a*uod**b
+
+
+def uob_Beggs_Robinson(rs, uod):
+    """Beggs-Robinson (1975) live-oil viscosity from the dead-oil value uod."""
+    a=10.715*(rs+100)**(-0.515)
+    b=5.44*(rs+150)**(-0.338)
+    return a*uod**b
+
+
+## Undersaturated oil -------------------------------------------------------------
+
+def uo_Vasquez_Beggs(p, pb, uob):
+    """Vasquez-Beggs (1980) above pb from the bubble-point value uob. p in psia."""
+    a=-3.9*10**(-5)*p-5
+    m=2.6*p**1.187*10**a
+    return uob*(p/pb)**m